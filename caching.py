@@ -0,0 +1,273 @@
+# caching.py - PROCESS-WIDE CACHE WITH A BYTE BUDGET
+#
+# One cache for every loader, aggregate and figure in the process, split
+# into namespaces so each kind can be inspected separately. Entries are
+# sized in bytes when stored, and the total is held under a global budget by
+# GreedyDual-Size eviction: an entry's priority is the clock plus its
+# compute cost per byte, refreshed on every hit, and the lowest priority is
+# evicted first. Cheap, bulky and stale entries go before expensive, compact
+# and recently used ones; with equal costs this reduces to LRU. Concurrent
+# misses on one key compute it once; the other callers wait and then hit.
+# Hit, miss, eviction and rejection counts are kept per namespace, and can be
+# exported in the Prometheus text format for alerting.
+import functools
+import hashlib
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BUDGET_MB = 512
+
+
+def sizeof(value, _seen=None):
+    """Approximate bytes held by `value`, counting shared objects once"""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes, bytearray)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k, seen) + sizeof(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(sizeof(item, seen) for item in value)
+    if hasattr(value, 'to_plotly_json'):
+        # Plotly figures keep back-references to their parents; size the spec
+        return sizeof(value.to_plotly_json(), seen)
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + sizeof(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'cost', 'priority')
+
+    def __init__(self, value, size, cost, priority):
+        self.value = value
+        self.size = size
+        self.cost = cost
+        self.priority = priority
+
+
+class CacheManager:
+    """Namespaced cache holding at most `max_bytes`, evicting by GreedyDual-Size"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = {}
+        self.total_bytes = 0
+        self.counters = {}
+        self._clock = 0.0
+        self._lock = threading.Lock()
+        # full key -> [lock, callers holding or waiting on it]
+        self._key_locks = {}
+
+    def _count(self, namespace, counter, n=1):
+        counts = self.counters.setdefault(
+            namespace, {'hits': 0, 'misses': 0, 'evictions': 0, 'rejected': 0})
+        counts[counter] += n
+
+    def _priority(self, size, cost):
+        # Floor the cost so free-to-build entries still age like LRU
+        return self._clock + max(cost, 1e-6) / max(size, 1)
+
+    def _hit(self, full_key):
+        """The cached entry for `full_key`, refreshed and counted as a hit, or None"""
+        entry = self.entries.pop(full_key, None)
+        if entry is not None:
+            # Re-inserted last, so equal priorities are evicted least recently used first
+            self.entries[full_key] = entry
+            entry.priority = self._priority(entry.size, entry.cost)
+            self._count(full_key[0], 'hits')
+        return entry
+
+    def get_or_compute(self, namespace, key, compute):
+        """Cached value for (namespace, key), calling `compute()` on a miss"""
+        full_key = (namespace, key)
+        with self._lock:
+            entry = self._hit(full_key)
+            if entry is not None:
+                return entry.value
+            key_lock = self._key_locks.setdefault(full_key, [threading.Lock(), 0])
+            key_lock[1] += 1
+
+        # One caller computes a missing key; the rest wait for it and then hit.
+        # Other keys are neither blocked nor blocking meanwhile.
+        try:
+            with key_lock[0]:
+                with self._lock:
+                    entry = self._hit(full_key)
+                    if entry is not None:
+                        return entry.value
+                    self._count(namespace, 'misses')
+
+                started = time.perf_counter()
+                value = compute()
+                cost = time.perf_counter() - started
+                size = sizeof(value)
+
+                with self._lock:
+                    if size > self.max_bytes:
+                        self._count(namespace, 'rejected')
+                        return value
+                    self._evict(self.max_bytes - size)
+                    self.entries[full_key] = _Entry(value, size, cost, self._priority(size, cost))
+                    self.total_bytes += size
+                return value
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self._key_locks[full_key]
+
+    def _evict(self, target_bytes):
+        """Evict the lowest-priority entries until the total is at most `target_bytes`"""
+        while self.total_bytes > target_bytes and self.entries:
+            full_key = min(self.entries, key=lambda k: self.entries[k].priority)
+            entry = self.entries.pop(full_key)
+            self._clock = entry.priority
+            self.total_bytes -= entry.size
+            self._count(full_key[0], 'evictions')
+
+    def remeasure(self, namespace, key):
+        """Re-size an entry whose value grows in place, evicting if that breaks the budget"""
+        with self._lock:
+            entry = self.entries.get((namespace, key))
+            if entry is None:
+                return
+            size = sizeof(entry.value)
+            self.total_bytes += size - entry.size
+            entry.size = size
+            self._evict(self.max_bytes)
+
+    def clear(self, namespace=None):
+        """Drop every entry (or one namespace's); counters are kept"""
+        with self._lock:
+            for full_key in [k for k in self.entries if namespace is None or k[0] == namespace]:
+                self.total_bytes -= self.entries.pop(full_key).size
+
+    def stats(self):
+        """One row per namespace: entries, bytes, hits, misses, evictions, rejections, hit rate"""
+        with self._lock:
+            rows = {}
+            for namespace, counts in self.counters.items():
+                rows[namespace] = {'Entries': 0, 'Bytes': 0, **{k.title(): v for k, v in counts.items()}}
+            for (namespace, _), entry in self.entries.items():
+                rows[namespace]['Entries'] += 1
+                rows[namespace]['Bytes'] += entry.size
+        stats = pd.DataFrame.from_dict(rows, orient='index',
+                                       columns=['Entries', 'Bytes', 'Hits', 'Misses', 'Evictions',
+                                                'Rejected'])
+        stats.index.name = 'Namespace'
+        lookups = stats['Hits'] + stats['Misses']
+        stats['Hit_Rate'] = (stats['Hits'] / lookups.where(lookups > 0)).fillna(0.0)
+        return stats.sort_index()
+
+    def prometheus(self, prefix='kpi_cache'):
+        """Counters and gauges in the Prometheus text exposition format"""
+        stats = self.stats()
+        metrics = [
+            ('hits_total', 'counter', 'Cache lookups served from memory', 'Hits'),
+            ('misses_total', 'counter', 'Cache lookups that had to compute', 'Misses'),
+            ('evictions_total', 'counter', 'Entries evicted to stay under the budget', 'Evictions'),
+            ('rejected_total', 'counter', 'Values too large for the budget, returned uncached', 'Rejected'),
+            ('entries', 'gauge', 'Entries currently cached', 'Entries'),
+            ('bytes', 'gauge', 'Estimated bytes currently cached', 'Bytes'),
+        ]
+        lines = []
+        for name, kind, help_text, column in metrics:
+            lines += [f'# HELP {prefix}_{name} {help_text}', f'# TYPE {prefix}_{name} {kind}']
+            lines += [f'{prefix}_{name}{{namespace="{ns}"}} {value}' for ns, value in stats[column].items()]
+        lines += [f'# HELP {prefix}_budget_bytes Global byte budget', f'# TYPE {prefix}_budget_bytes gauge',
+                  f'{prefix}_budget_bytes {self.max_bytes}',
+                  f'# HELP {prefix}_total_bytes Estimated bytes cached across namespaces',
+                  f'# TYPE {prefix}_total_bytes gauge', f'{prefix}_total_bytes {self.total_bytes}']
+        return '\n'.join(lines) + '\n'
+
+    def write_metrics(self, path):
+        """Atomically write `prometheus()` to `path` (e.g. for a textfile collector)"""
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+
+# The process-wide cache; KPI_CACHE_MAX_MB sets its budget
+CACHE = CacheManager(int(float(os.environ.get('KPI_CACHE_MAX_MB', DEFAULT_BUDGET_MB)) * 1024 * 1024))
+
+
+def _fingerprint(code, digest=None):
+    """Hash of a function's bytecode and constants, including nested functions"""
+    digest = digest or hashlib.sha256()
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            _fingerprint(const, digest)
+        else:
+            digest.update(repr(const).encode())
+    return digest
+
+
+def memoize(namespace, cache=None):
+    """Cache a function's results in `namespace`, keyed by its code and (hashable) arguments
+
+    Keys use the function's name and bytecode rather than its identity, so a
+    function redefined on every Streamlit rerun keeps hitting the same entries
+    until its code changes.
+    """
+    def decorate(fn):
+        fingerprint = _fingerprint(fn.__code__).hexdigest()[:12]
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (fn.__module__, fn.__qualname__, fingerprint, args, tuple(sorted(kwargs.items())))
+            return (cache or CACHE).get_or_compute(namespace, key, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorate
+
+
+if __name__ == '__main__':
+    # Cross-checks of the eviction policy and of per-key compute: python caching.py
+    from concurrent.futures import ThreadPoolExecutor
+
+    def build(n_bytes, seconds=0.0):
+        def compute():
+            time.sleep(seconds)
+            return np.zeros(n_bytes // 8)
+        return compute
+
+    # An expensive entry outlives cheap ones of the same size added after it
+    cache = CacheManager(3_000_000)
+    cache.get_or_compute('slow', 0, build(1_000_000, 0.05))
+    for i in range(5):
+        cache.get_or_compute('fast', i, build(1_000_000))
+    kept = sorted(cache.entries)
+    assert kept == [('fast', 3), ('fast', 4), ('slow', 0)], kept
+    assert cache.total_bytes <= cache.max_bytes
+
+    # Concurrent misses on one key compute once; the rest are hits
+    cache = CacheManager(10_000_000)
+    computes = []
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: cache.get_or_compute(
+            'once', 'key', lambda: computes.append(1) or time.sleep(0.2) or b'x'), range(8)))
+    stats = cache.stats().loc['once']
+    assert len(computes) == 1 and stats['Hits'] == 7 and not cache._key_locks, stats
+
+    # Values larger than the budget are counted and left uncached
+    cache = CacheManager(100)
+    cache.get_or_compute('big', 0, lambda: bytes(1000))
+    assert not cache.entries and cache.stats().loc['big', 'Rejected'] == 1
+
+    print(cache.stats().to_string())
+    print("GreedyDual-Size eviction, per-key compute and rejection checks passed")
@@ -0,0 +1,151 @@
+# cold_start.py - COLD-START AND TIME-TO-FIRST-PAINT BENCHMARK FOR app.py
+#
+# Each run launches a fresh `streamlit run` server, connects to it the way a
+# browser does (a websocket that requests a script run) and times the stream
+# of messages that comes back: when the server is ready, when the first
+# element reaches the page and when the script has finished. `--imports`
+# prints the slowest imports on the app's startup path.
+#
+# Usage:
+#   python cold_start.py --runs 5 --imports 15
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+APP_PATH = str(Path(__file__).with_name('app.py'))
+
+# Modules app.py imports, in the order it imports them
+STARTUP_MODULES = ['streamlit', 'anomalies', 'caching', 'cohorts', 'dashboard_spec',
+                   'data_sources', 'forecasting', 'validation']
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+
+async def wait_until_healthy(port, process, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {process.returncode}")
+        try:
+            urllib.request.urlopen(f'http://localhost:{port}/_stcore/health', timeout=1)
+            return
+        except OSError:
+            await asyncio.sleep(0.02)
+    raise TimeoutError("streamlit server did not become healthy")
+
+
+def launch_server(port):
+    """A headless `streamlit run app.py` on `port` (also used by load_test.py)"""
+    return subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', APP_PATH,
+         '--server.headless', 'true', '--server.port', str(port),
+         '--browser.gatherUsageStats', 'false'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def _first_session(port, timeout):
+    """Request a script run; returns seconds to the first delta and to script_finished"""
+    async with websockets.connect(f'ws://localhost:{port}/_stcore/stream', max_size=None) as ws:
+        request = BackMsg()
+        request.rerun_script.query_string = ''
+        await ws.send(request.SerializeToString())
+        start = time.perf_counter()
+        first_paint = None
+        while True:
+            message = ForwardMsg()
+            message.ParseFromString(await asyncio.wait_for(ws.recv(), timeout))
+            kind = message.WhichOneof('type')
+            if kind == 'delta' and first_paint is None:
+                first_paint = time.perf_counter() - start
+            elif kind == 'script_finished':
+                return first_paint, time.perf_counter() - start
+
+
+def run_cold_start(timeout=60):
+    """Start a fresh server and time one browser session against it"""
+    port = free_port()
+    launched = time.perf_counter()
+    process = launch_server(port)
+    try:
+        async def session():
+            await wait_until_healthy(port, process, timeout)
+            ready = time.perf_counter() - launched
+            first_paint, finished = await _first_session(port, timeout)
+            return ready, first_paint, finished
+        ready, first_paint, finished = asyncio.run(session())
+    finally:
+        process.terminate()
+        process.wait()
+    return {
+        'server_ready_s': ready,
+        'first_paint_s': first_paint,
+        'first_run_s': finished,
+        'launch_to_paint_s': ready + first_paint,
+        'launch_to_done_s': ready + finished,
+    }
+
+
+def slowest_imports(limit=15):
+    """(cumulative ms, module) for the slowest imports on the app's startup path"""
+    code = f"import sys; sys.path.insert(0, {str(Path(APP_PATH).parent)!r}); " + \
+        '; '.join(f'import {m}' for m in STARTUP_MODULES)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, check=True)
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are already counted in their top-level importer
+        if not name[1:].startswith(' '):
+            timings.append((int(cumulative) / 1000, name.strip()))
+    return sorted(timings, reverse=True)[:limit]
+
+
+def print_report(runs):
+    print(f"{'':<22}{'median':>9}{'min':>9}{'max':>9}")
+    labels = {
+        'server_ready_s': "server ready",
+        'first_paint_s': "first paint (request)",
+        'first_run_s': "first run (request)",
+        'launch_to_paint_s': "launch -> first paint",
+        'launch_to_done_s': "launch -> full page",
+    }
+    for key, label in labels.items():
+        values = np.array([r[key] for r in runs]) * 1000
+        print(f"{label:<22}{np.median(values):>7.0f}ms{values.min():>7.0f}ms{values.max():>7.0f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold start and time-to-first-paint of app.py")
+    parser.add_argument('--runs', type=int, default=3, help="Fresh server launches to time")
+    parser.add_argument('--imports', type=int, default=0,
+                        help="Also list the N slowest imports on the startup path")
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args(argv)
+
+    runs = [run_cold_start(args.timeout) for _ in range(args.runs)]
+    print_report(runs)
+    if args.imports:
+        print(f"\n{'cumulative ms':>13}  module")
+        for ms, name in slowest_imports(args.imports):
+            print(f"{ms:>13.1f}  {name}")
+    return runs
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,756 @@
+# dashboard_spec.py - DECLARATIVE DASHBOARD DEFINITIONS
+#
+# Every view is a list of tabs, every tab a list of rows, and every row a list
+# of elements (KPI metrics, charts, tables, headings). Elements declare the
+# data they need as a Query (compiled into a shared Plan, see query_plan.py)
+# or as a source function for data that isn't a plain groupby. Figures are
+# built here from the aggregated frames, independent of Streamlit.
+import copy
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+from query_plan import Plan, Query, reads
+from sketches import merge_rollup
+
+# Changes whenever this file does, so anything cached per element is rebuilt
+SPEC_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:12]
+
+QUARTER_ORDER = ['Q1 2023', 'Q2 2023', 'Q3 2023', 'Q4 2023',
+                 'Q1 2024', 'Q2 2024', 'Q3 2024', 'Q4 2024']
+COHORT_ORDER = ['Cohort 1', 'Cohort 2', 'Cohort 3', 'Cohort 4']
+
+# Months covered by each Time Period option (None = no lower bound)
+PERIOD_MONTHS = {
+    "Last 12 Months": 12,
+    "Last 6 Months": 6,
+    "Last Quarter": 3,
+    "Year to Date": None,
+    "All Time": None
+}
+
+# Market filter options
+MARKETS = ["All Markets", "North America", "Europe", "Asia Pacific", "Latin America"]
+
+def select_periods(dates, period):
+    """Return the monthly dates that fall in the selected Time Period"""
+    dates = pd.DatetimeIndex(sorted(set(dates)))
+    latest = dates.max()
+    if period == "Year to Date":
+        return set(dates[dates.year == latest.year])
+    months = PERIOD_MONTHS.get(period)
+    if months is None:
+        return set(dates)
+    months_ago = (latest.year - dates.year) * 12 + (latest.month - dates.month)
+    return set(dates[months_ago < months])
+
+
+# ELEMENTS
+class Element:
+    """Base for anything that reads a Query or source function"""
+
+    def __init__(self, query=None, source=None, transform=None, order=None,
+                 sort_by=None, ascending=True):
+        self.query = query
+        self.source = source
+        self.transform = transform
+        self.order = order or {}
+        self.sort_by = sort_by
+        self.ascending = ascending
+
+    @property
+    def input(self):
+        return self.query if self.query is not None else self.source
+
+    def frame(self, results):
+        df = results.get(self.input)
+        if self.transform:
+            df = self.transform(df)
+        if self.order:
+            df = df.copy()
+            for column, categories in self.order.items():
+                df[column] = pd.Categorical(df[column], categories=categories, ordered=True)
+            df = df.sort_values(list(self.order))
+        if self.sort_by:
+            df = df.sort_values(self.sort_by, ascending=self.ascending)
+        return df
+
+
+class Metric(Element):
+    """A single st.metric; `value` is a column name or a function of the row"""
+
+    def __init__(self, label, value, fmt='{:.1f}', delta=None, **kwargs):
+        super().__init__(**kwargs)
+        self.label = label
+        self.value = value
+        self.fmt = fmt
+        self.delta = delta
+
+    def raw_value(self, results):
+        row = self.frame(results).iloc[0]
+        return self.value(row) if callable(self.value) else row[self.value]
+
+    def formatted(self, results):
+        return self.fmt.format(self.raw_value(results))
+
+
+class Chart(Element):
+    """A Plotly chart of `kind` (see FIGURES) with a subheader `title`
+
+    `forecast=True` marks a time-series chart ('line' or 'pivot_lines' over a
+    Query grouped by time first) that can be extended with projections.
+    """
+
+    def __init__(self, title, kind, layout=None, forecast=False, **kwargs):
+        element_kwargs = {k: kwargs.pop(k) for k in
+                          ('query', 'source', 'transform', 'order', 'sort_by', 'ascending')
+                          if k in kwargs}
+        super().__init__(**element_kwargs)
+        self.title = title
+        self.kind = kind
+        self.layout = layout or {}
+        self.forecast = forecast
+        self.options = kwargs
+
+    def figure(self, results, forecasts=None):
+        frame = self.frame(results)
+        fig = FIGURES[self.kind](frame, **self.options)
+        if self.forecast and forecasts:
+            self._add_forecast(fig, frame, forecasts)
+        fig.update_layout(**self.layout)
+        return fig
+
+    def _add_forecast(self, fig, frame, forecasts):
+        """Append a dashed projection from the last actual point of each series"""
+        x = self.options['x']
+        if self.kind == 'pivot_lines':
+            wide = frame.pivot(index=x, columns=self.options['columns'], values=self.options['y'])
+        else:
+            wide = frame.set_index(x)[[self.options['y']]]
+            wide.columns = [None]
+
+        for i, value in enumerate(wide.columns):
+            if (self.query, value) not in forecasts:
+                continue
+            periods, predicted = forecasts[(self.query, value)]
+            color = fig.data[i].line.color or DEFAULT_COLORS[i % len(DEFAULT_COLORS)]
+            fig.add_trace(go.Scatter(
+                x=[wide.index[-1]] + list(periods),
+                y=[wide[value].iloc[-1]] + list(predicted),
+                mode='lines',
+                name='Forecast',
+                line=dict(color=color, dash='dash'),
+                legendgroup='forecast',
+                showlegend=i == 0
+            ))
+
+    def retitled(self, title):
+        chart = copy.copy(self)
+        chart.title = title
+        return chart
+
+
+class Table(Element):
+    """A st.dataframe of the element's frame"""
+
+
+# Styles for Badges.markup, shared by the app and the HTML report
+BADGE_CSS = """
+.anomaly-badge { display: inline-block; border-radius: 999px; padding: 0.25rem 0.75rem; margin: 0 0.5rem 0.5rem 0; font-size: 0.85rem; font-weight: 600; }
+.anomaly-badge.drop { background-color: #FEE2E2; color: #991B1B; }
+.anomaly-badge.spike { background-color: #FEF3C7; color: #92400E; }
+"""
+
+
+class Badges(Element):
+    """Alert badges, one per row of the element's frame (at most `limit`)"""
+
+    def __init__(self, empty, limit=8, **kwargs):
+        super().__init__(**kwargs)
+        self.empty = empty
+        self.limit = limit
+
+    def markup(self, flags):
+        """HTML for the first `limit` flags, styled by BADGE_CSS"""
+        digits = lambda value: 0 if abs(value) >= 100 else 2
+        badges = []
+        for flag in flags.head(self.limit).itertuples():
+            period = flag.Period.strftime('%b %Y') if isinstance(flag.Period, pd.Timestamp) else flag.Period
+            kind, arrow = ('drop', '▼') if flag.Score < 0 else ('spike', '▲')
+            badges.append(
+                f'<span class="anomaly-badge {kind}" title="Deviation score {flag.Score:+.1f}">'
+                f'{arrow} {flag.Series} ({period}): {flag.Value:,.{digits(flag.Value)}f} '
+                f'vs {flag.Expected:,.{digits(flag.Expected)}f} expected</span>'
+            )
+        return ''.join(badges)
+
+    def caption(self, flags):
+        """What the scan behind `flags` covered, if its source recorded one"""
+        scan = flags.attrs.get('scan')
+        if not scan:
+            return None
+        return (f"Scanned {scan['series']:,} series, {scan['scored_periods']:,} new periods "
+                f"in {scan['seconds'] * 1000:.0f} ms")
+
+
+class Heading:
+    """A section heading; `section` headings use the sub-header style"""
+
+    input = None
+
+    def __init__(self, text, section=False):
+        self.text = text
+        self.section = section
+
+
+class Trace:
+    """One series of a 'traces' chart; values are divided by `scale`"""
+
+    def __init__(self, column, name, color, kind='bar', secondary=False, scale=1):
+        self.column = column
+        self.name = name
+        self.color = color
+        self.kind = kind
+        self.secondary = secondary
+        self.scale = scale
+
+
+class Tab:
+    def __init__(self, label, rows):
+        self.label = label
+        self.rows = rows
+
+
+class View:
+    """A dashboard page; a single tab with no label renders without a tab bar"""
+
+    def __init__(self, header, tabs):
+        self.header = header
+        self.tabs = tabs
+
+    def elements(self):
+        for tab in self.tabs:
+            for row in tab.rows:
+                yield from row
+
+    def plan(self):
+        return Plan([e.input for e in self.elements() if e.input is not None])
+
+
+# FIGURE BUILDERS
+# plotly.express and plotly.subplots are imported by the builders that use
+# them, keeping their import cost off the app's startup path
+DEFAULT_COLORS = qualitative.Plotly
+
+def _line_figure(df, x, y):
+    import plotly.express as px
+    return px.line(df, x=x, y=y, markers=True, line_shape='linear')
+
+
+def _bar_figure(df, x, y, **kwargs):
+    import plotly.express as px
+    return px.bar(df, x=x, y=y, **kwargs)
+
+
+def _traces_figure(df, x, traces, yaxis_titles=None):
+    from plotly.subplots import make_subplots
+    secondary = any(t.secondary for t in traces)
+    fig = make_subplots(specs=[[{"secondary_y": True}]]) if secondary else go.Figure()
+    for t in traces:
+        y = df[t.column] / t.scale if t.scale != 1 else df[t.column]
+        if t.kind == 'bar':
+            trace = go.Bar(x=df[x], y=y, name=t.name, marker_color=t.color)
+        else:
+            trace = go.Scatter(x=df[x], y=y, name=t.name,
+                               mode='lines+markers', line=dict(color=t.color, width=2))
+        if secondary:
+            fig.add_trace(trace, secondary_y=t.secondary)
+        else:
+            fig.add_trace(trace)
+    if yaxis_titles:
+        fig.update_yaxes(title_text=yaxis_titles[0], secondary_y=False)
+        fig.update_yaxes(title_text=yaxis_titles[1], secondary_y=True)
+    return fig
+
+
+def _pivot_lines_figure(df, x, columns, y):
+    pivot = df.pivot(index=x, columns=columns, values=y)
+    fig = go.Figure()
+    for column in pivot.columns:
+        fig.add_trace(go.Scatter(x=pivot.index, y=pivot[column], mode='lines+markers', name=column))
+    return fig
+
+
+def _pie_figure(df, values, names, color_map, title_template):
+    import plotly.express as px
+    row = df.iloc[0]
+    return px.pie(
+        values=row[values].astype(float).values,
+        names=names,
+        color=names,
+        color_discrete_map=color_map,
+        title=title_template.format(**row)
+    )
+
+
+def _heatmap_figure(df, index, columns, values, figure_title=None, column_format=None, **kwargs):
+    import plotly.express as px
+    pivot = df.pivot(index=index, columns=columns, values=values)
+    if column_format:
+        # Labelled after pivoting, so numeric columns keep their numeric order
+        pivot.columns = [column_format.format(c) for c in pivot.columns]
+    return px.imshow(pivot, title=figure_title, **kwargs)
+
+
+FIGURES = {
+    'line': _line_figure,
+    'bar': _bar_figure,
+    'traces': _traces_figure,
+    'pivot_lines': _pivot_lines_figure,
+    'pie': _pie_figure,
+    'heatmap': _heatmap_figure,
+}
+
+
+# SOURCES (non-groupby inputs; called once per plan execution)
+# The sketch rollup simulates reach and lead-score events from one generator,
+# so each readout depends on both tables it is built from
+SKETCH_TABLES = ('Partner_Brand_Mentions', 'Marketing_Qualified_Leads')
+
+
+@reads(*SKETCH_TABLES)
+def _lead_score_percentiles(data, context):
+    rollup = context['load_sketches']()['Lead_Score']
+    periods = select_periods(data['Marketing_Qualified_Leads']['Date'], context['period'])
+    # Only sources with sketches in the period; quarantined rows leave gaps
+    sources = sorted({source for period, source in rollup if period in periods})
+    p50, p90 = np.array([
+        merge_rollup(rollup, periods=periods, keys={source}).quantile([0.5, 0.9])
+        for source in sources
+    ]).reshape(-1, 2).T
+    return pd.DataFrame({'Lead_Source': sources, 'p50': p50, 'p90': p90})
+
+
+@reads(*SKETCH_TABLES)
+def _overall_lead_score_percentiles(data, context):
+    rollup = context['load_sketches']()['Lead_Score']
+    periods = select_periods(data['Marketing_Qualified_Leads']['Date'], context['period'])
+    merged = merge_rollup(rollup, periods=periods)
+    p50, p90 = merged.quantile([0.5, 0.9]) if merged is not None else (np.nan, np.nan)
+    return pd.DataFrame({'p50': [p50], 'p90': [p90]})
+
+
+@reads(*SKETCH_TABLES)
+def _reach_summary(data, context):
+    rollup = context['load_sketches']()['Partner_Reach']
+    mentions = data['Partner_Brand_Mentions']
+    periods = select_periods(mentions['Date'], context['period'])
+    gross_reach = mentions.loc[mentions['Date'].isin(periods), 'Estimated_Reach'].sum()
+    merged = merge_rollup(rollup, periods=periods)
+    unique_reach = merged.count() if merged is not None else 0
+    return pd.DataFrame({
+        'Gross_Reach': [gross_reach],
+        'Unique_Reach': [unique_reach],
+        'Overlap': [1 - unique_reach / gross_reach if gross_reach else np.nan]
+    })
+
+
+@reads(*SKETCH_TABLES)
+def _unique_reach_by_partner(data, context):
+    rollup = context['load_sketches']()['Partner_Reach']
+    periods = select_periods(data['Partner_Brand_Mentions']['Date'], context['period'])
+    partners = sorted({partner for period, partner in rollup if period in periods})
+    return pd.DataFrame({
+        'Partner_Name': partners,
+        'Unique_Reach': [merge_rollup(rollup, periods=periods, keys={p}).count() / 1e6
+                         for p in partners]
+    })
+
+
+# Creator records are simulated independently of the loaded tables
+@reads()
+def _creator_cohorts(data, context):
+    return context['load_cohorts']().frame()
+
+
+def _anomaly_flags(data, context):
+    return context['anomaly_scanner'].update(data, kpi_series_queries(), context.get('data_version'))
+
+
+def _experience_scores(df):
+    scores = df.iloc[0].reset_index()
+    scores.columns = ['Metric', 'Average_Score']
+    scores['Average_Score'] = scores['Average_Score'].astype(float)
+    scores['Metric'] = scores['Metric'].str.replace('_Score', '').str.replace('_', ' ')
+    return scores
+
+
+def _with_conversion_rate(df):
+    return df.assign(Conversion_Rate=df['MQL_Count'] / df['Total_Leads'] * 100)
+
+
+# TABLE NAMES
+BRAND_HEALTH = 'Brand_Health_Index'
+DIGITAL_PRESENCE = 'Digital_Brand_Presence'
+MQL = 'Marketing_Qualified_Leads'
+PRODUCT_NPS = 'Product_NPS'
+PARTNER_NPS = 'Partner_NPS'
+PARTNER_MENTIONS = 'Partner_Brand_Mentions'
+CREATOR_NPS = 'Creator_Lab_NPS'
+INNOVATION = 'Innovation_Leadership_Index'
+
+EXPERIENCE_METRICS = ['Value_Communication_Score', 'Ease_Of_Understanding_Score',
+                      'Brand_Clarity_Score', 'Entertainment_Value_Score']
+NPS_CATEGORIES = ['Promoters_Pct', 'Passives_Pct', 'Detractors_Pct']
+SENTIMENT_COLUMNS = ['Positive_Sentiment_Pct', 'Negative_Sentiment_Pct', 'Neutral_Sentiment_Pct']
+
+
+# CHARTS USED BY MORE THAN ONE VIEW
+BRAND_HEALTH_TREND = Chart(
+    "Brand Health Trend", 'line',
+    query=Query(BRAND_HEALTH, {'Composite_Brand_Health_Score': 'mean'}, by='Date'),
+    order={'Date': QUARTER_ORDER},
+    x='Date', y='Composite_Brand_Health_Score', forecast=True,
+    layout=dict(xaxis_title='Quarter', yaxis_title='Composite Score', height=400)
+)
+
+MQL_CONVERSION = Query(MQL, {'MQL_Count': 'sum', 'Total_Leads': 'sum'})
+
+
+# ELEMENTS ALSO SERVED BY kpi_api.py
+SUMMARY_KPIS = [
+    [
+        Metric("Brand Health Index", 'Composite_Brand_Health_Score', delta="+8.1% YoY",
+               query=Query(BRAND_HEALTH, {'Composite_Brand_Health_Score': 'mean'})),
+        Metric("Total MQLs", 'MQL_Count', fmt='{:,.0f}', delta="+15% vs last period",
+               query=MQL_CONVERSION),
+        Metric("Product NPS", 'NPS_Score', fmt='{:.0f}', delta="+12 points",
+               query=Query(PRODUCT_NPS, {'NPS_Score': 'mean'})),
+        Metric("Innovation Index", 'Innovation_Leadership_Index', delta="+7.2%",
+               query=Query(INNOVATION, {'Innovation_Leadership_Index': 'mean'})),
+    ],
+    [
+        Metric("MQL Conversion", lambda row: row['MQL_Count'] / row['Total_Leads'] * 100,
+               fmt='{:.1f}%', delta="+2.3%", query=MQL_CONVERSION),
+        Metric("Brand Mentions", 'Mention_Count', fmt='{:,.0f}', delta="+42%",
+               query=Query(PARTNER_MENTIONS, {'Mention_Count': 'sum'})),
+        Metric("Partner NPS", 'NPS_Score', fmt='{:.0f}', delta="+9 points",
+               query=Query(PARTNER_NPS, {'NPS_Score': 'mean'})),
+        Metric("Creator NPS", 'NPS_Score', fmt='{:.0f}', delta="+11 points",
+               query=Query(CREATOR_NPS, {'NPS_Score': 'mean'})),
+    ],
+]
+
+MQL_BY_SOURCE = Chart(
+    "MQL Performance by Lead Source", 'traces',
+    query=Query(MQL, {'Total_Leads': 'sum', 'MQL_Count': 'sum'}, by='Lead_Source'),
+    transform=_with_conversion_rate,
+    x='Lead_Source',
+    traces=[Trace('Total_Leads', 'Total Leads', 'lightblue'),
+            Trace('MQL_Count', 'MQLs', 'orange'),
+            Trace('Conversion_Rate', 'Conversion Rate', 'red', kind='line', secondary=True)],
+    yaxis_titles=("Count", "Conversion Rate (%)"),
+    layout=dict(xaxis_title='Lead Source', title='MQL Performance by Lead Source',
+                barmode='group', height=500)
+)
+
+PARTNER_NPS_HEATMAP = Chart(
+    "Partner NPS Score Heatmap", 'heatmap',
+    query=Query(PARTNER_NPS, {'NPS_Score': 'mean'}, by=('Region', 'Partner_Type')),
+    index='Region', columns='Partner_Type', values='NPS_Score',
+    text_auto='.1f', color_continuous_scale='YlOrRd', figure_title='Partner NPS Score Heatmap',
+    layout=dict(height=400)
+)
+
+# Sketch-backed, so these follow the Time Period filter
+LEAD_SCORE_PERCENTILES = Chart(
+    None, 'traces',
+    source=_lead_score_percentiles,
+    x='Lead_Source',
+    traces=[Trace('p50', 'p50', 'lightblue'), Trace('p90', 'p90', 'orange')],
+    layout=dict(barmode='group', xaxis_title='Lead Source', yaxis_title='Lead Score', height=400)
+)
+
+UNIQUE_REACH_BY_PARTNER = Chart(
+    "Deduplicated Reach by Partner", 'bar',
+    source=_unique_reach_by_partner,
+    x='Partner_Name', y='Unique_Reach', text_auto='.2f', color='Partner_Name',
+    layout=dict(xaxis_title='Partner Name', yaxis_title='Deduplicated Reach (Millions)',
+                height=400, showlegend=False)
+)
+
+INNOVATION_CATEGORIES = Chart(
+    "Innovation Category Performance", 'traces',
+    query=Query(INNOVATION, {'Innovation_Leadership_Index': 'mean', 'Association_Share_Pct': 'mean'},
+                by='Innovation_Category', where='latest_date'),
+    x='Innovation_Category',
+    traces=[Trace('Innovation_Leadership_Index', 'Leadership Index', 'lightblue'),
+            Trace('Association_Share_Pct', 'Association Share %', 'orange')],
+    layout=dict(barmode='group', xaxis_title='Innovation Category',
+                yaxis_title='Score / Percentage', height=500)
+)
+
+DIGITAL_PRESENCE_BY_MARKET = Chart(
+    "Digital Brand Presence by Market", 'bar',
+    query=Query(DIGITAL_PRESENCE, {'Composite_Digital_Presence_Score': 'mean'}, by='Market'),
+    x='Market', y='Composite_Digital_Presence_Score', color='Market', text_auto='.1f',
+    layout=dict(yaxis_title='Composite Score', height=400, showlegend=False)
+)
+
+
+# EXECUTIVE SUMMARY
+EXECUTIVE_SUMMARY = View('📈 Executive Summary', [Tab(None, [
+    *SUMMARY_KPIS,
+    [Heading("Anomaly Alerts", section=True)],
+    [Badges("No anomalies in the latest period across all KPI series", source=_anomaly_flags)],
+    [Heading("Performance Trends", section=True)],
+    [
+        BRAND_HEALTH_TREND,
+        Chart("MQL Conversion Trend", 'line',
+              query=Query(MQL, {'Conversion_Rate': 'mean'}, by='Date'),
+              x='Date', y='Conversion_Rate', forecast=True,
+              layout=dict(xaxis_title='Month', yaxis_title='Conversion Rate (%)',
+                          yaxis_tickformat='.1%', height=400)),
+    ],
+])])
+
+
+# MARKET POSITION
+MARKET_POSITION = View('🎯 Market Position & Lead Generation', [
+    Tab("📈 Trends", [[
+        BRAND_HEALTH_TREND.retitled("Brand Health Index Trend"),
+        Chart("Lead Score Trend", 'line',
+              query=Query(MQL, {'Lead_Score_Average': 'mean'}, by='Date'),
+              x='Date', y='Lead_Score_Average', forecast=True,
+              layout=dict(xaxis_title='Month', yaxis_title='Average Lead Score', height=400)),
+    ]]),
+    Tab("📊 Performance", [[
+        DIGITAL_PRESENCE_BY_MARKET,
+        Chart("MQL Volume by Month", 'traces',
+              query=Query(MQL, {'Total_Leads': 'sum', 'MQL_Count': 'sum'}, by='Date'),
+              x='Date',
+              traces=[Trace('Total_Leads', 'Total Leads', 'lightblue'),
+                      Trace('MQL_Count', 'MQLs', 'orange')],
+              layout=dict(barmode='group', xaxis_title='Month', yaxis_title='Count', height=400)),
+    ]]),
+    Tab("🎯 Lead Quality", [
+        [MQL_BY_SOURCE],
+        [Heading("Lead Score Percentiles by Lead Source")],
+        [
+            Metric("Median Lead Score (p50)", 'p50', source=_overall_lead_score_percentiles),
+            Metric("Top-Decile Lead Score (p90)", 'p90', source=_overall_lead_score_percentiles),
+        ],
+        [LEAD_SCORE_PERCENTILES],
+    ]),
+])
+
+
+# PRODUCT EXPERIENCE
+LATEST_EXPERIENCE = Query(PRODUCT_NPS, {m: 'mean' for m in EXPERIENCE_METRICS}, where='latest_quarter')
+
+PRODUCT_EXPERIENCE = View('⭐ Product Experience - "First Meet" NPS', [
+    Tab("📈 NPS Trends", [[
+        Chart("NPS Score Trend by Touchpoint", 'pivot_lines',
+              query=Query(PRODUCT_NPS, {'NPS_Score': 'mean'}, by=('Year_Quarter', 'Touchpoint')),
+              order={'Year_Quarter': QUARTER_ORDER},
+              x='Year_Quarter', columns='Touchpoint', y='NPS_Score', forecast=True,
+              layout=dict(xaxis_title='Quarter', yaxis_title='NPS Score', height=400)),
+        Chart("NPS Distribution", 'pie',
+              query=Query(PRODUCT_NPS, {**{c: 'mean' for c in NPS_CATEGORIES}, 'Year_Quarter': 'max'},
+                          where='latest_quarter'),
+              values=NPS_CATEGORIES,
+              names=['Promoters', 'Passives', 'Detractors'],
+              color_map={'Promoters': '#2ecc71', 'Passives': '#f39c12', 'Detractors': '#e74c3c'},
+              title_template='NPS Distribution ({Year_Quarter})',
+              layout=dict(height=400)),
+    ]]),
+    Tab("🎯 Experience Metrics", [
+        [Chart("Experience Metrics", 'bar',
+               query=LATEST_EXPERIENCE, transform=_experience_scores,
+               x='Metric', y='Average_Score', text_auto='.2f', color='Metric',
+               layout=dict(yaxis_title='Average Score (1-5)', yaxis_range=[3.5, 5],
+                           height=400, showlegend=False))],
+        [Table(query=LATEST_EXPERIENCE, transform=_experience_scores)],
+    ]),
+])
+
+
+# PARTNER VALUE
+PARTNER = View('🤝 Partner Value & Enablement', [
+    Tab("📊 NPS Analysis", [[
+        Chart("Partner NPS Trend", 'line',
+              query=Query(PARTNER_NPS, {'NPS_Score': 'mean'}, by='Year'),
+              x='Year', y='NPS_Score', forecast=True,
+              layout=dict(xaxis_title='Year', yaxis_title='Average NPS Score', height=400)),
+        Chart("Brand Perception by Partner Type", 'traces',
+              query=Query(PARTNER_NPS, {'Brand_Awareness_Score': 'mean',
+                                        'Innovation_Leadership_Score': 'mean'}, by='Partner_Type'),
+              x='Partner_Type',
+              traces=[Trace('Brand_Awareness_Score', 'Brand Awareness', 'lightblue'),
+                      Trace('Innovation_Leadership_Score', 'Innovation Leadership', 'orange')],
+              layout=dict(barmode='group', xaxis_title='Partner Type', yaxis_title='Average Score',
+                          yaxis_range=[3.5, 5], height=400)),
+    ]]),
+    Tab("📣 Brand Mentions", [
+        [
+            Metric("Gross Reach", lambda row: row['Gross_Reach'] / 1e6, fmt='{:,.1f}M',
+                   source=_reach_summary),
+            Metric("Deduplicated Reach", lambda row: row['Unique_Reach'] / 1e6, fmt='{:,.1f}M',
+                   source=_reach_summary),
+            Metric("Audience Overlap", 'Overlap', fmt='{:.0%}', source=_reach_summary),
+        ],
+        [
+            Chart("Partner Brand Mentions Trend", 'traces',
+                  query=Query(PARTNER_MENTIONS, {'Mention_Count': 'sum', 'Estimated_Reach': 'sum'},
+                              by='Date'),
+                  x='Date',
+                  traces=[Trace('Mention_Count', 'Mention Count', '#2ecc71', kind='line'),
+                          Trace('Estimated_Reach', 'Estimated Reach (M)', '#e74c3c', kind='line',
+                                secondary=True, scale=1e6)],
+                  yaxis_titles=("Mention Count", "Estimated Reach (Millions)"),
+                  layout=dict(xaxis_title='Month', title='Partner Brand Mentions Trend', height=400)),
+            Chart("Brand Mentions by Partner", 'bar',
+                  query=Query(PARTNER_MENTIONS, {'Mention_Count': 'sum'}, by='Partner_Name'),
+                  sort_by='Mention_Count',
+                  x='Mention_Count', y='Partner_Name', orientation='h', text_auto=True,
+                  color='Mention_Count', color_continuous_scale='viridis',
+                  layout=dict(xaxis_title='Total Mention Count', yaxis_title='Partner Name',
+                              height=400, coloraxis_showscale=False)),
+        ],
+        [UNIQUE_REACH_BY_PARTNER],
+    ]),
+    Tab("🌐 Regional View", [[
+        PARTNER_NPS_HEATMAP,
+    ]]),
+])
+
+
+# INNOVATION LEADERSHIP
+INNOVATION_VIEW = View('💡 Innovation Leadership', [
+    Tab("📈 Index Trends", [[
+        Chart("Innovation Leadership Index Trend", 'line',
+              query=Query(INNOVATION, {'Innovation_Leadership_Index': 'mean'}, by='Date'),
+              x='Date', y='Innovation_Leadership_Index', forecast=True,
+              layout=dict(xaxis_title='Month', yaxis_title='Innovation Leadership Index', height=400)),
+        Chart("Total Innovation Mentions Trend", 'line',
+              query=Query(INNOVATION, {'Total_Mentions': 'sum'}, by='Date'),
+              x='Date', y='Total_Mentions', forecast=True,
+              layout=dict(xaxis_title='Month', yaxis_title='Total Mentions', height=400)),
+    ]]),
+    Tab("🧭 Category Analysis", [[
+        INNOVATION_CATEGORIES,
+    ]]),
+    Tab("🎯 Sentiment Insights", [[
+        Chart("Sentiment Analysis", 'traces',
+              query=Query(INNOVATION, {c: 'mean' for c in SENTIMENT_COLUMNS},
+                          by='Innovation_Category', where='latest_date'),
+              x='Innovation_Category',
+              traces=[Trace(c, c.replace('_Sentiment_Pct', ''), color)
+                      for c, color in zip(SENTIMENT_COLUMNS, ['#2ecc71', '#e74c3c', '#f39c12'])],
+              layout=dict(barmode='stack', xaxis_title='Innovation Category',
+                          yaxis_title='Sentiment Percentage', height=500)),
+    ]]),
+])
+
+
+# CREATOR ADVOCACY
+CREATOR = View('🎨 Creator Advocacy', [
+    Tab("📊 NPS Analysis", [[
+        Chart("Average NPS by Content Type", 'bar',
+              query=Query(CREATOR_NPS, {'NPS_Score': 'mean'}, by='Content_Type'),
+              sort_by='NPS_Score', ascending=False,
+              x='Content_Type', y='NPS_Score', text_auto='.1f', color='NPS_Score',
+              color_continuous_scale='Viridis',
+              layout=dict(xaxis_title='Content Type', yaxis_title='Average NPS Score',
+                          yaxis_range=[0, 60], height=400, showlegend=False,
+                          coloraxis_showscale=False)),
+        Chart("Creator NPS Trend", 'line',
+              query=Query(CREATOR_NPS, {'NPS_Score': 'mean'}, by='Quarter'),
+              order={'Quarter': QUARTER_ORDER},
+              x='Quarter', y='NPS_Score', forecast=True,
+              layout=dict(xaxis_title='Quarter', yaxis_title='Average NPS Score', height=400)),
+    ]]),
+    Tab("📈 Program Performance", [[
+        Chart("Program Evaluation by Content Type", 'traces',
+              query=Query(CREATOR_NPS, {'Program_Value_Score': 'mean',
+                                        'Workflow_Efficiency_Score': 'mean'}, by='Content_Type'),
+              x='Content_Type',
+              traces=[Trace('Program_Value_Score', 'Program Value', 'lightblue'),
+                      Trace('Workflow_Efficiency_Score', 'Workflow Efficiency', 'orange')],
+              layout=dict(barmode='group', xaxis_title='Content Type', yaxis_title='Average Score',
+                          yaxis_range=[3.5, 5], height=500)),
+    ]]),
+    Tab("👥 Cohort Insights", [
+        [
+            Chart("NPS Score by Cohort", 'bar',
+                  query=Query(CREATOR_NPS, {'NPS_Score': 'mean'}, by='Cohort'),
+                  order={'Cohort': COHORT_ORDER},
+                  x='Cohort', y='NPS_Score', text_auto='.1f', color='Cohort',
+                  layout=dict(yaxis_title='Average NPS Score', yaxis_range=[0, 60], height=400,
+                              showlegend=False)),
+            Chart("Total Survey Responses by Content Type", 'bar',
+                  query=Query(CREATOR_NPS, {'Response_Count': 'sum'}, by='Content_Type'),
+                  sort_by='Response_Count',
+                  x='Response_Count', y='Content_Type', orientation='h', text_auto=True,
+                  color='Content_Type',
+                  layout=dict(xaxis_title='Total Response Count', yaxis_title='Content Type',
+                              height=400, showlegend=False)),
+        ],
+        [Heading("Retention and NPS Progression by Join Quarter", section=True)],
+        [
+            Chart("Creators Still Active (%)", 'heatmap',
+                  source=_creator_cohorts, order={'Cohort': QUARTER_ORDER},
+                  index='Cohort', columns='Age', values='Retention_Pct', column_format='Q+{}',
+                  text_auto='.0f', color_continuous_scale='Blues', aspect='auto',
+                  labels=dict(x='Quarters Since Joining', y='Join Quarter', color='Active %'),
+                  layout=dict(height=450)),
+            Chart("Creator NPS by Tenure", 'heatmap',
+                  source=_creator_cohorts, order={'Cohort': QUARTER_ORDER},
+                  index='Cohort', columns='Age', values='NPS', column_format='Q+{}',
+                  text_auto='.0f', color_continuous_scale='RdYlGn', aspect='auto',
+                  labels=dict(x='Quarters Since Joining', y='Join Quarter', color='NPS'),
+                  layout=dict(height=450)),
+        ],
+    ]),
+])
+
+
+# Sidebar label -> view
+VIEWS = {
+    "📊 Executive Summary": EXECUTIVE_SUMMARY,
+    "🎯 Market Position & Lead Gen": MARKET_POSITION,
+    "⭐ Product Experience": PRODUCT_EXPERIENCE,
+    "🤝 Partner Value & Enablement": PARTNER,
+    "💡 Innovation Leadership": INNOVATION_VIEW,
+    "🎨 Creator Advocacy": CREATOR,
+}
+
+
+# Per-dimension KPI series, forecast and scanned alongside the charted trends
+KPI_SERIES = [
+    Query(MQL, {'MQL_Count': 'sum'}, by=('Date', 'Lead_Source')),
+    Query(MQL, {'Conversion_Rate': 'mean'}, by=('Date', 'Lead_Source')),
+    Query(MQL, {'Lead_Score_Average': 'mean'}, by=('Date', 'Lead_Source')),
+    Query(PRODUCT_NPS, {'NPS_Score': 'mean'}, by=('Year_Quarter', 'Touchpoint')),
+    Query(PARTNER_MENTIONS, {'Mention_Count': 'sum'}, by=('Date', 'Partner_Name')),
+    Query(PARTNER_MENTIONS, {'Estimated_Reach': 'sum'}, by=('Date', 'Partner_Name')),
+    Query(PARTNER_NPS, {'NPS_Score': 'mean'}, by=('Year', 'Partner_Type')),
+    Query(INNOVATION, {'Innovation_Leadership_Index': 'mean'}, by=('Date', 'Innovation_Category')),
+    Query(INNOVATION, {'Total_Mentions': 'sum'}, by=('Date', 'Innovation_Category')),
+    Query(CREATOR_NPS, {'NPS_Score': 'mean'}, by=('Quarter', 'Cohort')),
+    Query(CREATOR_NPS, {'NPS_Score': 'mean'}, by=('Quarter', 'Content_Type')),
+]
+
+def kpi_series_queries():
+    """Every KPI time series: the forecastable charted trends plus KPI_SERIES"""
+    charted = [e.query for view in VIEWS.values() for e in view.elements()
+               if isinstance(e, Chart) and e.forecast]
+    return list(dict.fromkeys(charted + KPI_SERIES))
+
+
+# The anomaly scan reads every KPI series, which are only known once VIEWS is
+reads(*sorted({query.table for query in kpi_series_queries()}))(_anomaly_flags)
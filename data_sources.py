@@ -0,0 +1,231 @@
+# data_sources.py - KPI TABLES AND EVENT-LEVEL SKETCHES
+#
+# Plain functions with no Streamlit dependency, so the app, the static report
+# and other tools all build dashboards from the same data. app.py wraps them
+# in its caches.
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from sketches import HyperLogLog, KLLSketch
+
+
+def simulated_data(seed=0):
+    """Generate simulated data for demonstration
+
+    The tables draw from a private generator seeded with `seed`, so the app,
+    the static report and the KPI API all see the same numbers, even when
+    they load concurrently, and NumPy's global generator is left alone.
+    """
+    rng = np.random.RandomState(seed)
+    
+    # Generate dates
+    dates = pd.date_range(start='2023-01-01', end='2024-01-01', freq='M')
+    quarters = [f'Q{(i%4)+1} 202{3 if i<4 else 4}' for i in range(len(dates))]
+    
+    # Brand Health Index
+    brand_health = pd.DataFrame({
+        'Date': quarters[:8],
+        'Composite_Brand_Health_Score': [78.2, 79.5, 81.3, 82.1, 83.4, 84.2, 85.0, 85.5]
+    })
+    
+    # Digital Brand Presence
+    markets = ['North America', 'Europe', 'Asia Pacific']
+    digital_presence = pd.DataFrame({
+        'Market': np.repeat(markets, 4),
+        'Composite_Digital_Presence_Score': [85.3, 87.2, 82.4, 86.1, 83.2, 84.5, 81.3, 85.6, 79.4, 81.2, 78.5, 80.3]
+    })
+    
+    # Marketing Qualified Leads
+    mql_data = []
+    sources = ['Organic Search', 'Paid Social', 'Email', 'Events']
+    for i, date in enumerate(dates[:6]):
+        for source in sources:
+            base = 200 + i * 50
+            total = base + rng.randint(-20, 50)
+            mql_count = int(total * (0.25 + i * 0.03))
+            mql_data.append({
+                'Date': date,
+                'Lead_Source': source,
+                'Total_Leads': total,
+                'MQL_Count': mql_count,
+                'Lead_Score_Average': 68 + i * 3 + rng.randint(-5, 5),
+                'Conversion_Rate': mql_count / total
+            })
+    mql_df = pd.DataFrame(mql_data)
+    
+    # Product NPS
+    touchpoints = ['Website Demo', 'Product Tour', 'Trial Signup', 'First Login']
+    product_nps_data = []
+    for i, quarter in enumerate(quarters[:8]):
+        for j, touchpoint in enumerate(touchpoints):
+            product_nps_data.append({
+                'Date': quarter,
+                'Year_Quarter': quarter,
+                'Touchpoint': touchpoint,
+                'NPS_Score': 45 + i * 3 + j * 2,
+                'Value_Communication_Score': 4.0 + i * 0.1 + j * 0.05,
+                'Ease_Of_Understanding_Score': 4.2 + i * 0.08 + j * 0.03,
+                'Brand_Clarity_Score': 4.1 + i * 0.09 + j * 0.04,
+                'Entertainment_Value_Score': 4.3 + i * 0.07 + j * 0.06,
+                'Promoters_Pct': 50 + i * 2 + j * 1,
+                'Passives_Pct': 30 - i * 1 - j * 0.5,
+                'Detractors_Pct': 20 - i * 1 - j * 0.5
+            })
+    product_nps_df = pd.DataFrame(product_nps_data)
+    
+    # Partner NPS
+    regions = ['NA', 'EMEA', 'APAC']
+    partner_types = ['Technology', 'Channel', 'Strategic']
+    partner_nps_data = []
+    for year in [2022, 2023]:
+        for region in regions:
+            for p_type in partner_types:
+                partner_nps_data.append({
+                    'Year': year,
+                    'Region': region,
+                    'Partner_Type': p_type,
+                    'NPS_Score': 55 + (year-2022) * 5 + rng.randint(-10, 10),
+                    'Brand_Awareness_Score': 4.1 + (year-2022) * 0.2 + rng.uniform(-0.1, 0.1),
+                    'Innovation_Leadership_Score': 4.2 + (year-2022) * 0.3 + rng.uniform(-0.1, 0.1)
+                })
+    partner_nps_df = pd.DataFrame(partner_nps_data)
+    
+    # Partner Mentions
+    partners = ['Partner A', 'Partner B', 'Partner C', 'Partner D']
+    partner_mentions_data = []
+    for i, date in enumerate(dates[:6]):
+        for partner in partners:
+            partner_mentions_data.append({
+                'Date': date,
+                'Partner_Name': partner,
+                'Mention_Count': 100 + i * 40 + rng.randint(-20, 50),
+                'Estimated_Reach': 500000 + i * 200000 + rng.randint(-100000, 300000),
+                'Co_Branded': rng.choice(['Yes', 'No'], p=[0.6, 0.4])
+            })
+    partner_mentions_df = pd.DataFrame(partner_mentions_data)
+    
+    # Innovation Leadership
+    categories = ['Audio Tech', 'Immersive Experience', 'Cinema Innovation', 'Gaming Tech']
+    audiences = ['Consumers', 'Professionals', 'Developers', 'Partners']
+    innovation_data = []
+    for i, date in enumerate(dates[:6]):
+        for j, category in enumerate(categories):
+            for audience in audiences:
+                innovation_data.append({
+                    'Date': date,
+                    'Innovation_Category': category,
+                    'Audience': audience,
+                    'Innovation_Leadership_Index': 70 + i * 3 + j * 2,
+                    'Association_Share_Pct': 30 + i * 5 + j * 3,
+                    'Positive_Sentiment_Pct': 70 + i * 2,
+                    'Negative_Sentiment_Pct': 10 - i * 0.5,
+                    'Neutral_Sentiment_Pct': 20 - i * 1.5,
+                    'Category_Sentiment_Score': 4.0 + i * 0.1 + j * 0.05,
+                    'Total_Mentions': 200 + i * 100 + j * 50
+                })
+    innovation_df = pd.DataFrame(innovation_data)
+    
+    # Creator NPS
+    content_types = ['Video Tutorial', 'Case Study', 'Social Campaign', 'Event Content']
+    cohorts = ['Cohort 1', 'Cohort 2', 'Cohort 3', 'Cohort 4']
+    creator_nps_data = []
+    for i, quarter in enumerate(quarters[:8]):
+        for j, content_type in enumerate(content_types):
+            creator_nps_data.append({
+                'Date': quarter,
+                'Quarter': quarter,
+                'Content_Type': content_type,
+                'Cohort': cohorts[j % 4],
+                'NPS_Score': 52 + i * 2 + j * 1,
+                'Program_Value_Score': min(4.2 + i * 0.1 + j * 0.05, 5.0),
+                'Workflow_Efficiency_Score': 4.1 + i * 0.08 + j * 0.03,
+                'Promoters_Pct': 55 + i * 2 + j * 1,
+                'Passives_Pct': 30 - i * 1 - j * 0.5,
+                'Detractors_Pct': 15 - i * 1 - j * 0.5,
+                'Response_Count': 80 + i * 20 + j * 10
+            })
+    creator_nps_df = pd.DataFrame(creator_nps_data)
+    
+    return {
+        'Brand_Health_Index': brand_health,
+        'Digital_Brand_Presence': digital_presence,
+        'Marketing_Qualified_Leads': mql_df,
+        'Product_NPS': product_nps_df,
+        'Partner_NPS': partner_nps_df,
+        'Partner_Brand_Mentions': partner_mentions_df,
+        'Creator_Lab_NPS': creator_nps_df,
+        'Innovation_Leadership_Index': innovation_df
+    }
+
+
+def sketch_rollup(data):
+    """Build mergeable sketches per (period, partner/source) from event-level data
+
+    The simulated tables only carry aggregates, so the underlying events are
+    simulated here: audience ids reached by each partner mention (drawn from
+    overlapping audience segments) and the individual score of every lead.
+    """
+    rng = np.random.default_rng(42)
+
+    # Deduplicated reach: one HyperLogLog per (month, partner)
+    mentions = data['Partner_Brand_Mentions']
+    partners = sorted(mentions['Partner_Name'].unique())
+    segment_size = 3_000_000
+    reach_rollup = {}
+    for row in mentions.itertuples(index=False):
+        segment_start = partners.index(row.Partner_Name) * segment_size // 2
+        audience = rng.integers(segment_start, segment_start + segment_size, size=row.Estimated_Reach)
+        reach_rollup[(row.Date, row.Partner_Name)] = HyperLogLog().add(audience)
+
+    # Lead score percentiles: one KLL sketch per (month, lead source)
+    mql = data['Marketing_Qualified_Leads']
+    lead_score_rollup = {}
+    for row in mql.itertuples(index=False):
+        scores = rng.normal(row.Lead_Score_Average, 10, size=row.Total_Leads).clip(0, 100)
+        lead_score_rollup[(row.Date, row.Lead_Source)] = KLLSketch().update(scores)
+
+    return {
+        'Partner_Reach': reach_rollup,
+        'Lead_Score': lead_score_rollup
+    }
+
+
+def creator_participation(n_creators=200_000, n_quarters=8, seed=7):
+    """Simulated creator-level Creator Lab records: one row per creator per active quarter
+
+    Each creator joins in some quarter (later quarters recruit more) and stays
+    for a geometric number of quarters; later cohorts churn less, and scores
+    rise with tenure. Quarter columns are categoricals in chronological order.
+    """
+    rng = np.random.default_rng(seed)
+    quarters = [f'Q{(i % 4) + 1} {2023 + i // 4}' for i in range(n_quarters)]
+
+    weights = np.linspace(1, 2, n_quarters)
+    joined = rng.choice(n_quarters, size=n_creators, p=weights / weights.sum())
+    churn = np.linspace(0.45, 0.25, n_quarters)[joined]
+    tenure = np.minimum(rng.geometric(churn), n_quarters - joined)
+
+    # Expand creators into consecutive active quarters without a Python loop
+    creator = np.repeat(np.arange(n_creators), tenure)
+    starts = np.cumsum(tenure) - tenure
+    age = np.arange(len(creator)) - np.repeat(starts, tenure)
+    cohort = joined[creator]
+    score = rng.normal(7.9 + 0.2 * age + 0.08 * cohort, 1.5).round().clip(0, 10).astype(np.int8)
+
+    return pd.DataFrame({
+        'Creator_ID': creator,
+        'Join_Period': pd.Categorical.from_codes(cohort, quarters),
+        'Period': pd.Categorical.from_codes(cohort + age, quarters),
+        'Recommend_Score': score,
+    })
+
+
+def data_version(data):
+    """Content hash of the loaded tables; changes whenever the data does"""
+    digest = hashlib.sha256()
+    for name, df in sorted(data.items()):
+        digest.update(name.encode())
+        digest.update(pd.util.hash_pandas_object(df).values.tobytes())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,118 @@
+# forecasting.py - BATCHED KPI FORECASTS
+#
+# Every model here fits a whole matrix of series at once (one row per series,
+# one column per period) with NumPy array operations, so projecting every
+# touchpoint, partner, category, cohort and lead source costs about the same
+# as projecting one.
+import time
+
+import numpy as np
+
+from kpi_series import future_periods, series_batches
+
+
+def linear_trend(Y, horizon, season=1):
+    """Least-squares straight line per row"""
+    n_periods = Y.shape[1]
+    if n_periods < 2:
+        return np.repeat(Y[:, -1:], horizon, axis=1)
+    t = np.arange(n_periods)
+    centred = t - t.mean()
+    slope = (Y - Y.mean(axis=1, keepdims=True)) @ centred / (centred @ centred)
+    intercept = Y.mean(axis=1) - slope * t.mean()
+    future = np.arange(n_periods, n_periods + horizon)
+    return intercept[:, None] + slope[:, None] * future
+
+
+def seasonal_naive(Y, horizon, season=1):
+    """Repeat the last observed season (the last value if history is shorter)"""
+    season = min(season, Y.shape[1])
+    return Y[:, Y.shape[1] - season + np.arange(horizon) % season]
+
+
+def exponential_smoothing(Y, horizon, season=1, grid=np.linspace(0.1, 0.9, 5)):
+    """Holt's linear method; (alpha, beta) picked per row from `grid` by in-sample SSE"""
+    n_series, n_periods = Y.shape
+    if n_periods < 3:
+        return linear_trend(Y, horizon)
+
+    # One smoothing state per (parameter pair, series), updated in place;
+    # periods are read as contiguous rows of the transposed matrix
+    columns = np.ascontiguousarray(Y.T)
+    alpha, beta = (g.ravel()[:, None] for g in np.meshgrid(grid, grid))
+    level = np.broadcast_to(columns[0], (len(alpha), n_series)).copy()
+    trend = np.broadcast_to(columns[1] - columns[0], (len(alpha), n_series)).copy()
+    sse = np.zeros_like(level)
+    predicted = np.empty_like(level)
+    error = np.empty_like(level)
+    for y in columns[1:]:
+        np.add(level, trend, out=predicted)
+        np.subtract(y, predicted, out=error)
+        sse += error * error
+        # level' = predicted + alpha * error; trend' = trend + beta * (level' - level - trend)
+        np.multiply(alpha, error, out=error)
+        error += predicted
+        np.subtract(error, predicted, out=predicted)
+        predicted *= beta
+        trend += predicted
+        level, error = error, level
+
+    best = sse.argmin(axis=0)
+    series = np.arange(n_series)
+    steps = np.arange(1, horizon + 1)
+    return level[best, series][:, None] + trend[best, series][:, None] * steps
+
+
+METHODS = {
+    "Linear Trend": linear_trend,
+    "Seasonal Naive": seasonal_naive,
+    "Exponential Smoothing": exponential_smoothing,
+}
+
+
+def forecast_series(data, queries, method, horizon=3):
+    """Forecast every series of the time-grouped `queries` in batches
+
+    Returns {(query, dimension value or None): (future periods, forecast values)}.
+    """
+    fit = METHODS[method]
+    forecasts = {}
+    for batch in series_batches(data, queries):
+        predicted = fit(batch.Y, horizon, batch.season)
+        for key, periods, values in zip(batch.keys, batch.periods, predicted):
+            forecasts[key] = (future_periods(periods, horizon), values)
+    return forecasts
+
+
+if __name__ == '__main__':
+    # Cross-check of the in-place Holt update against a naive loop, then a
+    # batch-fit benchmark: python forecasting.py
+    def holt_loop(y, horizon, grid=np.linspace(0.1, 0.9, 5)):
+        """Holt's linear method for one series, written as the textbook recurrence"""
+        best = None
+        for beta in grid:
+            for alpha in grid:
+                level, trend, sse = y[0], y[1] - y[0], 0.0
+                for value in y[1:]:
+                    predicted = level + trend
+                    sse += (value - predicted) ** 2
+                    new_level = predicted + alpha * (value - predicted)
+                    trend = trend + beta * (new_level - level - trend)
+                    level = new_level
+                if best is None or sse < best[0]:
+                    best = (sse, level, trend)
+        _, level, trend = best
+        return level + trend * np.arange(1, horizon + 1)
+
+    rng = np.random.default_rng(0)
+    Y = rng.normal(50, 5, size=(200, 24)).cumsum(axis=1)
+    error = np.abs(exponential_smoothing(Y, 6) - np.array([holt_loop(y, 6) for y in Y])).max()
+    assert error < 1e-8, error
+    print("In-place Holt matches the naive loop on 200 series")
+
+    for n_series in (1_000, 10_000, 50_000):
+        Y = rng.normal(50, 5, size=(n_series, 24)).cumsum(axis=1)
+        for name, fit in METHODS.items():
+            start = time.perf_counter()
+            fit(Y, 6, 12)
+            print(f"{n_series:>7} series  {name:<22} {(time.perf_counter() - start) * 1000:8.1f} ms")
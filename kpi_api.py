@@ -0,0 +1,291 @@
+# kpi_api.py - LOCAL JSON API FOR DASHBOARD KPIS
+#
+# Serves the numbers behind the dashboards as JSON, computed from the same
+# dashboard_spec.py elements the app renders, on a standard-library HTTP
+# server. Each endpoint declares the filters its data can honour: `period`
+# narrows the dated tables and `market` the per-market table, and asking an
+# endpoint for a filter it can't apply is a 400 rather than numbers for every
+# market labelled as one. Every response carries an ETag made from the data
+# version, the endpoint and the filters. A poll whose If-None-Match still
+# matches gets a 304 after a string comparison; other repeats are served from
+# a response cache under the same key. Nothing is recomputed until the data
+# changes.
+# Responses live in the process-wide byte-budgeted cache (caching.py), whose
+# hit/miss counters are served at /metrics for Prometheus.
+#
+# Usage:
+#   python kpi_api.py --port 8502
+#   curl 'http://localhost:8502/kpis/summary?period=Last+6+Months'
+#   curl 'http://localhost:8502/kpis/digital-presence?market=Europe'
+#   curl 'http://localhost:8502/metrics'
+import argparse
+import hashlib
+import json
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from caching import CACHE
+from dashboard_spec import (BRAND_HEALTH, CREATOR_NPS, DIGITAL_PRESENCE, DIGITAL_PRESENCE_BY_MARKET, INNOVATION,
+                            INNOVATION_CATEGORIES, LEAD_SCORE_PERCENTILES, MARKETS, MQL, MQL_BY_SOURCE,
+                            PARTNER_MENTIONS, PARTNER_NPS, PARTNER_NPS_HEATMAP, PERIOD_MONTHS, PRODUCT_NPS,
+                            SUMMARY_KPIS, UNIQUE_REACH_BY_PARTNER, select_periods)
+from data_sources import data_version, simulated_data, sketch_rollup
+from query_plan import Plan
+from validation import validate
+
+DEFAULT_PERIOD = "Last 12 Months"
+DEFAULT_MARKET = "All Markets"
+
+# Table -> the column `period` narrows it by (monthly dates, "Q1 2023"
+# quarter labels or years), and the tables `market` narrows
+PERIOD_COLUMNS = {
+    MQL: 'Date', PARTNER_MENTIONS: 'Date', INNOVATION: 'Date',
+    BRAND_HEALTH: 'Date', PRODUCT_NPS: 'Date', CREATOR_NPS: 'Date',
+    PARTNER_NPS: 'Year',
+}
+MARKET_TABLES = (DIGITAL_PRESENCE,)
+DEFAULTS = {'period': DEFAULT_PERIOD, 'market': DEFAULT_MARKET}
+CHOICES = {'period': list(PERIOD_MONTHS), 'market': MARKETS}
+
+# Endpoint -> the dashboard elements it serves
+ENDPOINTS = {
+    'summary': [metric for row in SUMMARY_KPIS for metric in row],
+    'mql-by-source': [MQL_BY_SOURCE],
+    'partner-nps-heatmap': [PARTNER_NPS_HEATMAP],
+    'innovation-categories': [INNOVATION_CATEGORIES],
+    'lead-score-percentiles': [LEAD_SCORE_PERCENTILES],
+    'partner-reach': [UNIQUE_REACH_BY_PARTNER],
+    'digital-presence': [DIGITAL_PRESENCE_BY_MARKET],
+}
+
+# Endpoint -> the filters that change its numbers. The innovation categories
+# read only the latest month, so no period changes them
+ENDPOINT_FILTERS = {
+    'summary': ('period',),
+    'mql-by-source': ('period',),
+    'partner-nps-heatmap': ('period',),
+    'innovation-categories': (),
+    'lead-score-percentiles': ('period',),
+    'partner-reach': ('period',),
+    'digital-presence': ('market',),
+}
+
+
+def _period_ends(column):
+    """The last day of each row's month, quarter ("Q1 2023") or year"""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column
+    if pd.api.types.is_integer_dtype(column):
+        periods = pd.PeriodIndex(column.astype(str), freq='Y')
+    else:
+        periods = pd.PeriodIndex(column.str.replace(r'Q(\d) (\d{4})', r'\2Q\1', regex=True), freq='Q')
+    return pd.Series(periods.end_time.normalize(), index=column.index)
+
+
+def filter_tables(data, period=None, market=None):
+    """`data` narrowed to the rows whose month, quarter or year ends in `period`
+    (counted back from each table's latest), and the market table to `market`"""
+    data = dict(data)
+    if period is not None:
+        for table, column in PERIOD_COLUMNS.items():
+            frame = data[table]
+            ends = _period_ends(frame[column])
+            data[table] = frame[ends.isin(select_periods(ends, period))]
+    if market not in (None, DEFAULT_MARKET):
+        for table in MARKET_TABLES:
+            frame = data[table]
+            data[table] = frame[frame['Market'] == market]
+    return data
+
+
+def _records(frame):
+    """JSON-ready rows, with timestamps as ISO dates"""
+    return json.loads(frame.to_json(orient='records', date_format='iso'))
+
+
+class KPIStore:
+    """The loaded tables plus JSON responses cached per (data version, endpoint, filters)"""
+
+    def __init__(self, loader=simulated_data, cache=CACHE):
+        self.loader = loader
+        self.cache = cache
+        self.version = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """Reload the tables; cached responses are dropped only if the data changed"""
+        data = validate(self.loader()).clean
+        version = data_version(data)
+        with self._lock:
+            if version != self.version:
+                self.data, self.version = data, version
+                self.cache.clear('responses')
+        return version
+
+    def snapshot(self):
+        """The current (data, version), consistent with each other"""
+        with self._lock:
+            return self.data, self.version
+
+    def sketches(self, data=None, version=None):
+        """Sketch rollup of one data version, built once even under concurrent requests"""
+        if data is None:
+            data, version = self.snapshot()
+        return self.cache.get_or_compute('loaders', ('sketch_rollup', version),
+                                         lambda: sketch_rollup(data))
+
+    def etag(self, endpoint, filters, version=None):
+        """`filters` holds only the filters the endpoint applies"""
+        key = '|'.join([endpoint, *(f'{name}={value}' for name, value in sorted(filters.items()))])
+        return f'"{version or self.version}-{hashlib.sha256(key.encode()).hexdigest()[:12]}"'
+
+    def response(self, endpoint, filters):
+        """(etag, JSON bytes) for an endpoint, computed at most once per data version"""
+        # Computed outside the store lock, so one slow endpoint doesn't hold up
+        # the others or a refresh; the cache has a lock of its own
+        data, version = self.snapshot()
+        return self.cache.get_or_compute(
+            'responses', (version, endpoint, tuple(sorted(filters.items()))),
+            lambda: (self.etag(endpoint, filters, version),
+                     json.dumps(self._compute(endpoint, filters, data, version)).encode()))
+
+    def _compute(self, endpoint, filters, data, version):
+        elements = ENDPOINTS[endpoint]
+        period = filters.get('period')
+        context = {
+            'period': period or "All Time",
+            'market': filters.get('market', DEFAULT_MARKET),
+            'load_sketches': lambda: self.sketches(data, version),
+            'data_version': version
+        }
+        data = filter_tables(data, period, filters.get('market'))
+        results = Plan([e.input for e in elements]).execute(data, context)
+        if endpoint == 'summary':
+            rows = [{'label': m.label, 'value': float(m.raw_value(results)),
+                     'formatted': m.formatted(results), 'delta': m.delta} for m in elements]
+        else:
+            rows = _records(elements[0].frame(results))
+        return {
+            'endpoint': endpoint,
+            'filters': filters,
+            'data_version': version,
+            'data': rows,
+        }
+
+
+class KPIRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'KPIAPI/1.0'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/')
+        if path in ('', '/kpis'):
+            self._send_json(200, {
+                'endpoints': {f'/kpis/{name}': list(ENDPOINT_FILTERS[name]) for name in ENDPOINTS},
+                'filters': CHOICES,
+                'data_version': self.server.store.version,
+            })
+            return
+        if path == '/metrics':
+            body = self.server.store.cache.prometheus().encode()
+            self._send_body(200, body, content_type='text/plain; version=0.0.4')
+            return
+        endpoint = path[len('/kpis/'):] if path.startswith('/kpis/') else None
+        if endpoint not in ENDPOINTS:
+            self._send_json(404, {'error': f"Unknown endpoint {url.path}"})
+            return
+
+        params = parse_qs(url.query)
+        supported = ENDPOINT_FILTERS[endpoint]
+        for name in params.keys() & CHOICES.keys():
+            if name not in supported:
+                self._send_json(400, {'error': f"/kpis/{endpoint} doesn't filter by {name}",
+                                      'filters': list(supported)})
+                return
+        filters = {name: params.get(name, [DEFAULTS[name]])[0] for name in supported}
+        for name, value in filters.items():
+            if value not in CHOICES[name]:
+                self._send_json(400, {'error': f"Unknown {name} '{value}'", 'choices': CHOICES[name]})
+                return
+
+        # Revalidation is a string comparison; the payload isn't touched
+        store = self.server.store
+        etag = store.etag(endpoint, filters)
+        if self._matches(etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            return
+
+        etag, body = store.response(endpoint, filters)
+        self._send_body(200, body, etag)
+
+    def _matches(self, etag):
+        """Whether the request's If-None-Match covers `etag`"""
+        header = self.headers.get('If-None-Match', '')
+        tags = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+        return etag in tags or '*' in tags
+
+    def _send_json(self, status, payload):
+        self._send_body(status, json.dumps(payload).encode())
+
+    def _send_body(self, status, body, etag=None, content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+            # Clients may keep the body but must revalidate before reusing it
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(store, host='localhost', port=8502, quiet=False):
+    server = ThreadingHTTPServer((host, port), KPIRequestHandler)
+    server.store = store
+    server.quiet = quiet
+    return server
+
+
+def _refresh_periodically(store, seconds):
+    while True:
+        time.sleep(seconds)
+        store.refresh()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve dashboard KPIs as JSON with ETag revalidation")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--refresh', type=float, default=3600,
+                        help="Seconds between data reloads (the dashboards refresh hourly)")
+    parser.add_argument('--quiet', action='store_true', help="Don't log every request")
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    store = KPIStore()
+    threading.Thread(target=_refresh_periodically, args=(store, args.refresh), daemon=True).start()
+    server = make_server(store, args.host, args.port, args.quiet)
+    print(f"Serving KPIs for data version {store.version} on http://{args.host}:{args.port}/kpis")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# kpi_series.py - KPI TIME SERIES AS BATCHED MATRICES
+#
+# Turns time-grouped queries into one row per (query, dimension value) and
+# stacks rows with the same length and seasonality into a single matrix, so
+# forecasting and anomaly detection can process every series in one pass.
+import re
+
+import numpy as np
+import pandas as pd
+
+from query_plan import Plan
+
+QUARTER_PATTERN = re.compile(r'Q([1-4]) (\d{4})')
+
+
+def _season_and_key(periods):
+    """Seasonal cycle length and chronological sort key for a time column"""
+    sample = periods[0]
+    if isinstance(sample, str) and QUARTER_PATTERN.fullmatch(sample):
+        return 4, lambda p: tuple(reversed(QUARTER_PATTERN.fullmatch(p).groups()))
+    if isinstance(sample, pd.Timestamp):
+        return 12, None
+    return 1, None
+
+
+def future_periods(periods, horizon):
+    """The next `horizon` labels after the last of `periods`"""
+    last = periods[-1]
+    if isinstance(last, str) and QUARTER_PATTERN.fullmatch(last):
+        quarter, year = map(int, QUARTER_PATTERN.fullmatch(last).groups())
+        index = year * 4 + quarter - 1
+        return [f'Q{(i % 4) + 1} {i // 4}' for i in range(index + 1, index + horizon + 1)]
+    if isinstance(last, pd.Timestamp):
+        return [last + pd.offsets.MonthEnd(h) for h in range(1, horizon + 1)]
+    return [last + h for h in range(1, horizon + 1)]
+
+
+def _series_rows(query, frame):
+    """Yield (dimension value, periods, season, values) for every series in a query result"""
+    time_column, dims = query.by[0], query.by[1:]
+    column = query.agg[0][0]
+    if dims:
+        wide = frame.set_index(list(dims) + [time_column])[column].unstack(time_column)
+    else:
+        wide = frame.set_index(time_column)[[column]].T
+        wide.index = [None]
+
+    season, key = _season_and_key(list(wide.columns))
+    periods = sorted(wide.columns, key=key)
+    wide = wide[periods].ffill(axis=1).bfill(axis=1)
+    for value, row in zip(wide.index, wide.to_numpy(dtype=float)):
+        yield value, periods, season, row
+
+
+class SeriesBatch:
+    """Series sharing a length and season: `Y[i]` is the series `keys[i]`"""
+
+    def __init__(self, season):
+        self.season = season
+        self.keys = []
+        self.periods = []
+        self.rows = []
+
+    @property
+    def Y(self):
+        return np.vstack(self.rows)
+
+
+def series_batches(data, queries):
+    """Group every series of the time-grouped `queries` into SeriesBatches
+
+    Each query is grouped by (time,) or (time, dimension); a series is keyed
+    by (query, dimension value or None).
+    """
+    results = Plan(queries).execute(data)
+    batches = {}
+    for query in queries:
+        for value, periods, season, row in _series_rows(query, results.get(query)):
+            batch = batches.setdefault((len(periods), season), SeriesBatch(season))
+            batch.keys.append((query, value))
+            batch.periods.append(periods)
+            batch.rows.append(row)
+    return list(batches.values())
+
+
+def series_label(key):
+    """Readable name for a series key, e.g. 'Creator Lab NPS · NPS Score · Cohort 2'"""
+    query, value = key
+    parts = [query.table.replace('_', ' '), query.agg[0][0].replace('_', ' ')]
+    if value is not None:
+        parts.append(str(value))
+    return ' · '.join(parts)
@@ -0,0 +1,194 @@
+# load_test.py - CONCURRENT SESSION LOAD GENERATOR FOR app.py
+#
+# Each session count gets a fresh `streamlit run` server, and every simulated
+# user is a websocket session against it, just as a browser tab is. The
+# sessions share the server's process-wide caches the way real users do. A
+# rerun counts only once the server reports that the script finished
+# successfully; any error or timeout fails the whole run. Memory is the
+# server's peak resident set size during the run, sampled throughout, and its
+# growth per session over the server once a warm-up session has loaded the
+# data and the shared caches, so the per-session figure leaves them out.
+#
+# Usage:
+#   python load_test.py --sessions 1,5,10,25 --iterations 20
+import argparse
+import asyncio
+import os
+import random
+import time
+from contextlib import AsyncExitStack
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from cold_start import free_port, launch_server, wait_until_healthy
+
+# Widget labels as rendered in the app sidebar
+DASHBOARD_LABEL = "Select Dashboard View"
+PERIOD_LABEL = "Time Period"
+MARKET_LABEL = "Market"
+REFRESH_LABEL = "🔄 Refresh Data"
+
+
+class RerunFailed(RuntimeError):
+    """A rerun that didn't reach a successful script_finished"""
+
+
+def process_rss_bytes(pid):
+    """Resident set size of process `pid` (Linux only; NaN elsewhere)"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return float('nan')
+
+
+async def _rerun(ws, widgets, timeout):
+    """Request a script run; returns the widgets it rendered once it finishes successfully"""
+    request = BackMsg()
+    request.rerun_script.query_string = ''
+    request.rerun_script.widget_states.widgets.extend(widgets)
+    await ws.send(request.SerializeToString())
+
+    rendered = {}
+    while True:
+        try:
+            raw = await asyncio.wait_for(ws.recv(), timeout)
+        except asyncio.TimeoutError:
+            raise RerunFailed(f"No script_finished within {timeout:.0f}s") from None
+        message = ForwardMsg()
+        message.ParseFromString(raw)
+        kind = message.WhichOneof('type')
+        if kind == 'delta' and message.delta.WhichOneof('type') == 'new_element':
+            element = message.delta.new_element
+            element_type = element.WhichOneof('type')
+            if element_type == 'exception':
+                raise RerunFailed(element.exception.message)
+            if element_type in ('selectbox', 'button'):
+                widget = getattr(element, element_type)
+                rendered[widget.label] = widget
+        elif kind == 'script_finished':
+            # "Refresh Data" calls st.rerun(), so a press ends in a second run
+            if message.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                rendered = {}
+                continue
+            if message.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                raise RerunFailed(f"Script finished with status "
+                                  f"{ForwardMsg.ScriptFinishedStatus.Name(message.script_finished)}")
+            return rendered
+
+
+async def run_session(ws, iterations, seed, timeout):
+    """Simulate one user; returns the latency of every rerun in seconds"""
+    rng = random.Random(seed)
+    rendered = await _rerun(ws, [], timeout)
+
+    latencies = []
+    for _ in range(iterations):
+        widgets = []
+        for label in (DASHBOARD_LABEL, PERIOD_LABEL, MARKET_LABEL):
+            if label not in rendered:
+                raise RerunFailed(f"Widget '{label}' not found in app")
+            box = rendered[label]
+            widgets.append(WidgetState(id=box.id, string_value=rng.choice(list(box.options))))
+        widgets.append(WidgetState(id=rendered[REFRESH_LABEL].id, trigger_value=True))
+
+        start = time.perf_counter()
+        rendered = await _rerun(ws, widgets, timeout)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def _sample_peak_rss(pid, peak, interval=0.05):
+    while True:
+        peak[0] = max(peak[0], process_rss_bytes(pid))
+        await asyncio.sleep(interval)
+
+
+async def _load(port, sessions, iterations, timeout, seed, pid):
+    url = f'ws://localhost:{port}/_stcore/stream'
+    # One warm-up session loads the data and fills the shared caches, so the
+    # first timed rerun isn't penalised and the baseline already holds them
+    async with websockets.connect(url, max_size=None) as ws:
+        await run_session(ws, 1, seed, timeout)
+
+    rss_warm = process_rss_bytes(pid)
+    peak = [rss_warm]
+    sampler = asyncio.create_task(_sample_peak_rss(pid, peak))
+    try:
+        async with AsyncExitStack() as stack:
+            sockets = [await stack.enter_async_context(websockets.connect(url, max_size=None))
+                       for _ in range(sessions)]
+            start = time.perf_counter()
+            latencies = await asyncio.gather(*(run_session(ws, iterations, seed + i, timeout)
+                                               for i, ws in enumerate(sockets)))
+            elapsed = time.perf_counter() - start
+            peak[0] = max(peak[0], process_rss_bytes(pid))
+    finally:
+        sampler.cancel()
+    return np.concatenate(latencies), elapsed, rss_warm, peak[0]
+
+
+def run_load(sessions, iterations, timeout=60, seed=0):
+    """Run `sessions` concurrent users against a fresh server and summarise rerun latency"""
+    port = free_port()
+    process = launch_server(port)
+    try:
+        async def load():
+            await wait_until_healthy(port, process, timeout)
+            return await _load(port, sessions, iterations, timeout, seed, process.pid)
+        latencies, elapsed, rss_warm, rss_peak = asyncio.run(load())
+    finally:
+        process.terminate()
+        process.wait()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'sessions': sessions,
+        'reruns': len(latencies),
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'throughput_rps': len(latencies) / elapsed,
+        'rss_mb': rss_peak / 1e6,
+        'mem_per_session_mb': (rss_peak - rss_warm) / sessions / 1e6,
+    }
+
+
+def print_report(results):
+    header = (f"{'sessions':>8} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'rerun/s':>8} {'peak MB':>8} {'MB/sess':>8}")
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r['sessions']:>8} {r['reruns']:>7} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+              f"{r['p99_ms']:>8.1f} {r['throughput_rps']:>8.1f} {r['rss_mb']:>8.1f} "
+              f"{r['mem_per_session_mb']:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test app.py with concurrent browser sessions")
+    parser.add_argument('--sessions', default='1,5,10',
+                        help="Comma-separated concurrent session counts to test")
+    parser.add_argument('--iterations', type=int, default=10,
+                        help="Filter changes + refreshes per session")
+    parser.add_argument('--timeout', type=float, default=60,
+                        help="Per-rerun timeout in seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in (int(s) for s in args.sessions.split(',')):
+        try:
+            results.append(run_load(n, args.iterations, args.timeout, args.seed))
+        except RerunFailed as error:
+            parser.exit(1, f"Load test failed with {n} session(s): {error}\n")
+    print_report(results)
+    return results
+
+
+if __name__ == '__main__':
+    main()
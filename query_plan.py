@@ -0,0 +1,117 @@
+# query_plan.py - DEDUPLICATED AGGREGATION PLANS
+#
+# Charts and KPIs declare the aggregate they need as a Query. A Plan groups
+# every query that scans the same (table, filter, dimensions) and computes all
+# of their aggregates in a single groupby pass, so overlapping charts share
+# one scan instead of each re-grouping the table.
+import pandas as pd
+
+# Named row filters a query can apply before aggregating
+FILTERS = {
+    'latest_date': lambda df: df[df['Date'] == df['Date'].max()],
+    'latest_quarter': lambda df: df[df['Year_Quarter'] == df['Year_Quarter'].max()],
+}
+
+
+class Query:
+    """Aggregate `agg` ({column: func}) of `table`, grouped by `by`, after filter `where`"""
+
+    def __init__(self, table, agg, by=(), where=None):
+        if isinstance(by, str):
+            by = (by,)
+        self.table = table
+        self.by = tuple(by)
+        self.where = where
+        self.agg = tuple(agg.items())
+
+    @property
+    def scan(self):
+        """Queries with the same scan key are answered by one groupby pass"""
+        return (self.table, self.where, self.by)
+
+    @property
+    def key(self):
+        return self.scan + (self.agg,)
+
+    def __eq__(self, other):
+        return isinstance(other, Query) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"Query({self.table!r}, {dict(self.agg)!r}, by={self.by!r}, where={self.where!r})"
+
+
+def reads(*tables):
+    """Declare the tables a source function reads (see Plan.tables)"""
+    def mark(source):
+        source.tables = tables
+        return source
+    return mark
+
+
+def _column(column, func):
+    return f'{column}|{func}'
+
+
+class Plan:
+    """Multi-aggregate passes compiled from a set of queries
+
+    Inputs that aren't a Query are source functions `fn(data, context)` for
+    data a groupby can't express; each distinct one is called once. Sources
+    declare the tables they read with @reads.
+    """
+
+    def __init__(self, inputs):
+        inputs = list(dict.fromkeys(inputs))
+        self.queries = [i for i in inputs if isinstance(i, Query)]
+        self.sources = [i for i in inputs if not isinstance(i, Query)]
+        self.passes = {}
+        for query in self.queries:
+            aggs = self.passes.setdefault(query.scan, {})
+            for column, func in query.agg:
+                aggs[_column(column, func)] = (column, func)
+
+    def tables(self):
+        """Names of every table the plan reads, via its passes or its sources"""
+        tables = {table for table, _, _ in self.passes}
+        for source in self.sources:
+            tables.update(source.tables)
+        return sorted(tables)
+
+    def execute(self, data, context=None):
+        """Run every pass once against `data` ({table name: DataFrame})"""
+        filtered = {}
+        results = {source: source(data, context) for source in self.sources}
+        for (table, where, by), aggs in self.passes.items():
+            if (table, where) not in filtered:
+                df = data[table]
+                filtered[(table, where)] = FILTERS[where](df) if where else df
+            df = filtered[(table, where)]
+
+            if by:
+                results[(table, where, by)] = df.groupby(list(by)).agg(**aggs).reset_index()
+            else:
+                results[(table, where, by)] = pd.DataFrame(
+                    {name: [df[column].agg(func)] for name, (column, func) in aggs.items()})
+        return PlanResult(results)
+
+    def __repr__(self):
+        return (f"Plan({len(self.queries)} queries -> {len(self.passes)} passes, "
+                f"{len(self.sources)} sources)")
+
+
+class PlanResult:
+    """Executed plan; `get` slices one query's frame out of its shared pass"""
+
+    def __init__(self, results):
+        self.results = results
+
+    def get(self, query):
+        if not isinstance(query, Query):
+            return self.results[query]
+        frame = self.results[query.scan]
+        columns = list(query.by) + [_column(column, func) for column, func in query.agg]
+        renamed = {_column(column, func): column for column, func in query.agg}
+        return frame[columns].rename(columns=renamed)
@@ -0,0 +1,289 @@
+# report.py - STATIC HTML REPORT BUNDLE
+#
+# Renders every dashboard view to an HTML page from the same definitions in
+# dashboard_spec.py that the app uses. plotly.js and the stylesheet are
+# written to the bundle once and shared by every page, so the folder opens
+# offline. Views render in parallel in a process pool, and a manifest of
+# input hashes lets a rerun skip views whose data, filters and code haven't
+# changed. A view's data is only the tables its plan reads.
+#
+# Usage:
+#   python report.py --out report --period "Last 12 Months" --workers 4
+import argparse
+import hashlib
+import html
+import json
+import re
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from anomalies import AnomalyScanner
+from cohorts import cohort_matrices
+from dashboard_spec import (BADGE_CSS, MARKETS, PERIOD_MONTHS, VIEWS, Badges, Chart, Heading, Metric, Table,
+                            kpi_series_queries)
+from data_sources import creator_participation, data_version, simulated_data, sketch_rollup
+from forecasting import METHODS as FORECAST_METHODS, forecast_series
+from validation import validate
+
+ROOT = Path(__file__).parent
+PLOTLY_JS = 'plotly.min.js'
+STYLESHEET = 'report.css'
+MANIFEST = 'manifest.json'
+
+# Modules whose code decides what a page shows; editing one rebuilds every page
+CODE_MODULES = ['report.py', 'dashboard_spec.py', 'query_plan.py', 'kpi_series.py',
+                'anomalies.py', 'forecasting.py', 'sketches.py', 'cohorts.py', 'data_sources.py',
+                'validation.py']
+
+CSS = """
+body { font-family: -apple-system, "Segoe UI", Roboto, sans-serif; margin: 0 auto; max-width: 1400px; padding: 1rem 2rem; color: #111827; }
+nav a { margin-right: 1rem; color: #1E3A8A; text-decoration: none; }
+nav a.current { font-weight: 700; }
+nav.tabs { margin: 0.5rem 0 1rem; font-size: 0.9rem; }
+.main-header { font-size: 2.5rem; color: #1E3A8A; font-weight: 700; text-align: center; margin-bottom: 1rem; }
+.sub-header { font-size: 1.5rem; color: #374151; font-weight: 600; margin-top: 2rem; margin-bottom: 1rem; border-bottom: 2px solid #E5E7EB; padding-bottom: 0.5rem; }
+.row { display: flex; gap: 1.5rem; }
+.row > div { flex: 1; min-width: 0; }
+.kpi-value { font-size: 2rem; font-weight: 700; color: #1E3A8A; }
+.kpi-label { font-size: 0.9rem; color: #6B7280; text-transform: uppercase; letter-spacing: 0.05em; }
+.delta { font-size: 0.9rem; color: #15803D; }
+.delta.down { color: #B91C1C; }
+.note { background-color: #ECFDF5; color: #065F46; padding: 0.75rem 1rem; border-radius: 0.5rem; }
+.caption { color: #6B7280; font-size: 0.85rem; }
+table.dataframe { border-collapse: collapse; font-size: 0.9rem; }
+table.dataframe th, table.dataframe td { padding: 0.3rem 0.75rem; border-bottom: 1px solid #E5E7EB; text-align: right; }
+""" + BADGE_CSS
+
+
+def page_name(label):
+    """File name for a view label, e.g. '📊 Executive Summary' -> 'executive-summary.html'"""
+    return re.sub(r'[^a-z0-9]+', '-', label.lower()).strip('-') + '.html'
+
+
+def code_fingerprint():
+    digest = hashlib.sha256()
+    for name in CODE_MODULES:
+        digest.update((ROOT / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def view_version(view, data):
+    """Content hash of just the tables `view` reads"""
+    return data_version({table: data[table] for table in view.plan().tables()})
+
+
+def input_hash(label, version, options, code):
+    """Everything a page depends on: the view, its tables, the filters and the code"""
+    key = json.dumps([label, version, options, code], sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+# RENDERING (runs in the worker processes)
+_worker = {}
+
+
+def _init_worker(data, version):
+    _worker['data'] = data
+    _worker['version'] = version
+    # An in-process build may follow another with different data
+    for cached in (_worker_sketches, _worker_cohorts, _worker_forecasts):
+        cached.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _worker_sketches():
+    return sketch_rollup(_worker['data'])
+
+
+@lru_cache(maxsize=None)
+def _worker_forecasts(method):
+    return forecast_series(_worker['data'], kpi_series_queries(), method)
+
+
+@lru_cache(maxsize=None)
+def _worker_cohorts():
+    records = creator_participation()
+    return cohort_matrices(records, list(records['Period'].cat.categories))
+
+
+def _element_html(element, results, forecasts):
+    if isinstance(element, Heading):
+        if element.section:
+            return f'<h3 class="sub-header">{element.text}</h3>'
+        return f'<h3>{element.text}</h3>'
+    if isinstance(element, Metric):
+        delta = ''
+        if element.delta:
+            direction = ' down' if element.delta.startswith('-') else ''
+            delta = f'<div class="delta{direction}">{html.escape(element.delta)}</div>'
+        return (f'<div class="kpi-label">{html.escape(element.label)}</div>'
+                f'<div class="kpi-value">{element.formatted(results)}</div>{delta}')
+    if isinstance(element, Chart):
+        title = f'<h3>{element.title}</h3>' if element.title else ''
+        figure = element.figure(results, forecasts)
+        return title + figure.to_html(full_html=False, include_plotlyjs=False, default_width='100%')
+    if isinstance(element, Table):
+        return element.frame(results).to_html(index=False, border=0, float_format='{:,.2f}'.format)
+    if isinstance(element, Badges):
+        flags = element.frame(results)
+        scan = f'<p class="caption">{element.caption(flags)}</p>' if element.caption(flags) else ''
+        if flags.empty:
+            return f'<p class="note">{element.empty}</p>' + scan
+        more = len(flags) - element.limit
+        caption = f'<p class="caption">+{more} more flagged series</p>' if more > 0 else ''
+        return element.markup(flags) + caption + scan
+    raise TypeError(f"Cannot render {type(element).__name__} to HTML")
+
+
+def _rows_html(rows, results, forecasts):
+    parts = []
+    for row in rows:
+        cells = [_element_html(element, results, forecasts) for element in row]
+        if len(cells) == 1:
+            parts.append(f'<div>{cells[0]}</div>')
+        else:
+            parts.append('<div class="row">' + ''.join(f'<div>{c}</div>' for c in cells) + '</div>')
+    return '\n'.join(parts)
+
+
+def render_page(label, options):
+    """Full HTML page for one view; returns (label, html)"""
+    data = _worker['data']
+    view = VIEWS[label]
+    version = view_version(view, data)
+    context = {
+        'period': options['period'],
+        'market': options['market'],
+        'load_sketches': _worker_sketches,
+        'load_cohorts': _worker_cohorts,
+        'anomaly_scanner': AnomalyScanner(),
+        'data_version': _worker['version']
+    }
+    results = view.plan().execute(data, context)
+    forecasts = _worker_forecasts(options['forecast']) if options['forecast'] else None
+
+    if len(view.tabs) == 1 and view.tabs[0].label is None:
+        body = _rows_html(view.tabs[0].rows, results, forecasts)
+    else:
+        anchors = [f'tab-{i}' for i in range(len(view.tabs))]
+        links = ''.join(f'<a href="#{a}">{tab.label}</a>' for a, tab in zip(anchors, view.tabs))
+        sections = [f'<section id="{a}"><h2>{tab.label}</h2>\n{_rows_html(tab.rows, results, forecasts)}</section>'
+                    for a, tab in zip(anchors, view.tabs)]
+        body = f'<nav class="tabs">{links}</nav>\n' + '\n'.join(sections)
+
+    nav = ''.join(f'<a href="{page_name(other)}"{" class=current" if other == label else ""}>{other}</a>'
+                  for other in VIEWS)
+    filters = f"{options['period']} · {options['market']}"
+    if options['forecast']:
+        filters += f" · {options['forecast']} forecast"
+    page = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(view.header)} - Dolby Marketing Analytics</title>
+<link rel="stylesheet" href="{STYLESHEET}">
+<script src="{PLOTLY_JS}"></script>
+</head>
+<body>
+<nav>{nav}</nav>
+<h1 class="main-header">📊 DOLBY MARKETING PERFORMANCE DASHBOARD</h1>
+<p class="caption">{filters} · data version {version}</p>
+<h2 class="sub-header">{view.header}</h2>
+{body}
+</body>
+</html>
+"""
+    return label, page
+
+
+# BUNDLE
+def _write_assets(out):
+    """plotly.js and the stylesheet, shared by every page and rewritten only when they change"""
+    import plotly
+    from plotly.offline import get_plotlyjs
+
+    stamp = out / f'{PLOTLY_JS}.version'
+    if not (out / PLOTLY_JS).exists() or not stamp.exists() or stamp.read_text() != plotly.__version__:
+        (out / PLOTLY_JS).write_text(get_plotlyjs(), encoding='utf-8')
+        stamp.write_text(plotly.__version__)
+    (out / STYLESHEET).write_text(CSS.lstrip(), encoding='utf-8')
+
+
+def build_report(out, period="Last 12 Months", market="All Markets", forecast=None,
+                 workers=None, force=False, seed=0):
+    """Render every stale view into `out`; returns a summary of the run"""
+    started = time.perf_counter()
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    _write_assets(out)
+
+    data = validate(simulated_data(seed)).clean
+    version = data_version(data)
+
+    options = {'period': period, 'market': market, 'forecast': forecast}
+    code = code_fingerprint()
+    manifest_path = out / MANIFEST
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    hashes = {label: input_hash(label, view_version(view, data), options, code)
+              for label, view in VIEWS.items()}
+    stale = [label for label in VIEWS
+             if force or manifest.get(label) != hashes[label] or not (out / page_name(label)).exists()]
+
+    if stale and workers == 1:
+        _init_worker(data, version)
+        pages = [render_page(label, options) for label in stale]
+    elif stale:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data, version)) as pool:
+            pages = list(pool.map(render_page, stale, [options] * len(stale)))
+    else:
+        pages = []
+
+    for label, page in pages:
+        (out / page_name(label)).write_text(page, encoding='utf-8')
+        manifest[label] = hashes[label]
+    # Drop views that no longer exist so the manifest mirrors the bundle
+    manifest = {label: manifest[label] for label in VIEWS if label in manifest}
+    manifest_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+
+    links = ''.join(f'<li><a href="{page_name(label)}">{label}</a></li>' for label in VIEWS)
+    (out / 'index.html').write_text(
+        f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>Dolby Marketing Analytics</title>\n'
+        f'<link rel="stylesheet" href="{STYLESHEET}">\n</head>\n<body>\n'
+        f'<h1 class="main-header">📊 DOLBY MARKETING PERFORMANCE DASHBOARD</h1>\n'
+        f'<ul>{links}</ul>\n</body>\n</html>\n', encoding='utf-8')
+
+    return {
+        'rendered': [label for label, _ in pages],
+        'skipped': [label for label in VIEWS if label not in stale],
+        'data_version': version,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render every dashboard view to a static HTML bundle")
+    parser.add_argument('--out', default='report', help="Output folder")
+    parser.add_argument('--period', default="Last 12 Months", choices=list(PERIOD_MONTHS))
+    parser.add_argument('--market', default="All Markets", choices=MARKETS)
+    parser.add_argument('--forecast', choices=list(FORECAST_METHODS),
+                        help="Draw dashed projections with this model")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Render processes (default: one per CPU; 1 renders in-process)")
+    parser.add_argument('--force', action='store_true', help="Rebuild views even if unchanged")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the simulated data")
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    summary = build_report(args.out, args.period, args.market, args.forecast,
+                           args.workers, args.force, args.seed)
+    print(f"Rendered {len(summary['rendered'])}, skipped {len(summary['skipped'])} unchanged "
+          f"view(s) in {summary['seconds']:.2f}s (data version {summary['data_version']}) -> {args.out}/")
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+# sketches.py - MERGEABLE APPROXIMATE AGGREGATES
+#
+# HyperLogLog for distinct counts and a KLL sketch for quantiles. Both are
+# updated with whole NumPy arrays and merge losslessly with other sketches of
+# the same configuration, so a rollup keyed by (period, key) can be combined
+# across any filter selection without going back to the raw events.
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+
+def hash64(values):
+    """Hash an array of ids to well-mixed uint64 values"""
+    values = np.asarray(values)
+    if values.dtype.kind not in 'iu':
+        return pd.util.hash_array(values)
+
+    # splitmix64 finaliser; uint64 arithmetic wraps, which is what we want
+    x = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class HyperLogLog:
+    """Distinct-count sketch with 2**p one-byte registers (~1.04/sqrt(2**p) error)"""
+
+    def __init__(self, p=14):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def add(self, ids, chunk_size=1_000_000):
+        ids = np.asarray(ids)
+        value_bits = 64 - self.p
+        for start in range(0, len(ids), chunk_size):
+            h = hash64(ids[start:start + chunk_size])
+            index = (h >> np.uint64(value_bits)).astype(np.intp)
+            rest = h & np.uint64((1 << value_bits) - 1)
+
+            # Rank = position of the leftmost 1-bit in the remaining bits
+            bit_length = np.frexp(rest.astype(np.float64))[1]
+            # float64 rounding can overshoot by one just below a power of two
+            overshoot = (bit_length > 0) & (
+                (np.uint64(1) << (bit_length - 1).clip(0).astype(np.uint64)) > rest)
+            bit_length = bit_length - overshoot
+            rank = (value_bits + 1 - bit_length).astype(np.uint8)
+
+            np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        merged = HyperLogLog(self.p)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+
+        # Linear counting is more accurate while many registers are still empty
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return float(estimate)
+
+
+class KLLSketch:
+    """Quantile sketch; level h holds items that each stand for 2**h inputs
+
+    Compaction keeps the odd or even half at random; the fixed default seed
+    makes merges of the same sketches reproducible across reruns.
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+
+            items = np.sort(items)
+            # An odd item out stays behind; the rest is halved at random
+            keep = items[:len(items) % 2]
+            promoted = items[len(keep):][self._rng.integers(2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # Capacities depend on the height, so re-check from the bottom
+            level = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        merged = KLLSketch(max(self.k, other.k))
+        height = max(len(self.levels), len(other.levels))
+        merged.levels = [
+            np.concatenate([s.levels[h] for s in (self, other) if h < len(s.levels)])
+            for h in range(height)
+        ]
+        merged.n = self.n + other.n
+        merged._compress()
+        return merged
+
+    def quantile(self, q):
+        items = np.concatenate(self.levels)
+        if not len(items):
+            return np.full(np.shape(q), np.nan)
+        weights = np.concatenate([np.full(len(lvl), 2.0 ** h) for h, lvl in enumerate(self.levels)])
+
+        order = np.argsort(items)
+        cumulative = np.cumsum(weights[order])
+        ranks = np.asarray(q) * cumulative[-1]
+        position = np.searchsorted(cumulative, ranks, side='left').clip(0, len(items) - 1)
+        return items[order][position]
+
+
+def merge_rollup(rollup, periods=None, keys=None):
+    """Merge the (period, key) -> sketch entries matching the given filters"""
+    selected = [
+        sketch for (period, key), sketch in rollup.items()
+        if (periods is None or period in periods) and (keys is None or key in keys)
+    ]
+    if not selected:
+        return None
+    return reduce(lambda a, b: a.merge(b), selected)
+
+
+if __name__ == '__main__':
+    # Accuracy cross-checks against exact answers: python sketches.py
+    rng = np.random.default_rng(0)
+
+    # HyperLogLog: within 3 standard errors of the exact distinct count, and
+    # merging per-chunk sketches gives the registers of one sketch over all ids
+    hll_error = 3 * 1.04 / np.sqrt(1 << 14)
+    for n_distinct in (1_000, 100_000, 2_000_000):
+        ids = rng.integers(0, 2**62, size=n_distinct)
+        ids = np.concatenate([ids, ids[:n_distinct // 2]])
+        whole = HyperLogLog().add(ids)
+        merged = reduce(HyperLogLog.merge, (HyperLogLog().add(chunk) for chunk in np.array_split(ids, 7)))
+        exact = len(np.unique(ids))
+        error = whole.count() / exact - 1
+        assert abs(error) < hll_error, (n_distinct, error)
+        assert np.array_equal(whole.registers, merged.registers)
+        print(f"HLL   {exact:>9,} distinct  estimate {whole.count():>12,.0f}  error {error:+.2%}")
+    labels = np.array([f'user-{i}' for i in range(50_000)], dtype=object)
+    error = HyperLogLog().add(labels).count() / len(labels) - 1
+    assert abs(error) < hll_error, error
+
+    # KLL: the rank of each estimated quantile is within 2% of the requested
+    # one, for one sketch and for a merge of sketches over parts of the data
+    q = np.linspace(0.01, 0.99, 99)
+    for n_values in (10_000, 1_000_000):
+        values = rng.normal(70, 10, size=n_values)
+        exact = np.sort(values)
+        parts = (KLLSketch(seed=i).update(part) for i, part in enumerate(np.array_split(values, 12)))
+        sketches = {'single': KLLSketch().update(values), 'merged': reduce(KLLSketch.merge, parts)}
+        for name, sketch in sketches.items():
+            ranks = np.searchsorted(exact, sketch.quantile(q)) / n_values
+            worst = np.abs(ranks - q).max()
+            assert worst < 0.02 and sketch.n == n_values, (n_values, name, worst)
+            print(f"KLL   {n_values:>9,} values  {name}  max rank error {worst:.2%}")
+    print("HyperLogLog and KLL accuracy checks passed")